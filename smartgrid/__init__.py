@@ -0,0 +1 @@
+"""Data and compute paths behind the Smart Grid Predictive Maintenance dashboard."""
@@ -0,0 +1,266 @@
+"""Reproducible benchmarks for the dashboard's data and compute paths.
+
+    python -m smartgrid.benchmark run --output bench.json
+    python -m smartgrid.benchmark compare base.json bench.json --threshold 0.15
+
+Every case draws its inputs from fixed seeds, is calibrated so one sample
+lasts at least ``min_time`` (fast calls are looped), warmed up, and then
+sampled ``repeat`` times. Results are per-call seconds; ``compare`` flags a
+case as a regression when its median slows down by more than the threshold
+and exits non-zero, so it can gate CI between commits.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from smartgrid.catalog import BUSINESS_IMPACT
+from smartgrid.crews import generate_crews, optimize_schedule, work_orders_from_fleet
+from smartgrid.features import synthesize_features
+from smartgrid.fleet import asset_ids, generate_fleet, top_risk_positions
+from smartgrid.index import AssetIndex
+from smartgrid.ranking import RiskIndex
+from smartgrid.roi import SIMULATION_TRIALS, roi_summary, simulate_roi
+from smartgrid.scoring import train_default_engine
+from smartgrid.survival import DEFAULT_SURVIVAL, FleetSurvival, WeibullSurvival, simulate_failures
+from smartgrid.table import query_page
+from smartgrid.thresholds import ThresholdOptimizer
+
+SEED = 42
+FLEET_NOW = "2025-01-01T00:00:00"
+FLEET_SIZES = (10_000, 100_000, 1_000_000)
+CREW_SIZES = ((5, 8), (23, 150), (50, 500))   # (crews, work orders); the first is solved exactly
+TABLE_FILTERS = {"asset_type": ["Transformer", "Circuit Breaker"],
+                 "location": ["Substation Alpha", "Distribution Hub North"],
+                 "risk_level": ["CRITICAL", "HIGH", "MEDIUM"]}
+DEFAULT_THRESHOLD = 0.15
+
+
+def measure(function, repeat=7, warmup=1, min_time=0.05):
+    """Per-call timing statistics in seconds for ``function()``."""
+    started = time.perf_counter()
+    function()
+    first = time.perf_counter() - started
+    number = max(1, math.ceil(min_time / first)) if first > 0 else 1000
+    for _ in range(warmup):
+        for _ in range(number):
+            function()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - started) / number)
+    ordered = sorted(samples)
+    return {
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p95": ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)],
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+# Cases: (name, zero-argument callable), built lazily so large fixtures are freed between sizes
+def _fleet_cases(n, engine):
+    fleet = generate_fleet(n, seed=SEED, now=FLEET_NOW)
+    probs = fleet["failure_probability"].to_numpy()
+    rng = np.random.default_rng(SEED)
+    yield f"fleet.generate[{n}]", lambda: generate_fleet(n, seed=SEED, now=FLEET_NOW)
+
+    risk_index = RiskIndex(probs)
+    yield f"ranking.build[{n}]", lambda: RiskIndex(probs)
+    yield f"ranking.top_k[{n}]", lambda: risk_index.top_k(20)
+    yield f"ranking.top_k_tiers[{n}]", lambda: risk_index.top_k(100, tiers=("CRITICAL", "HIGH"))
+    movers = rng.integers(0, n, 1000)
+    deltas = rng.normal(0.0, 0.01, 1000)
+
+    def update():
+        # Forward and back, so the index is unchanged between samples
+        risk_index.apply_deltas(movers, deltas)
+        risk_index.apply_deltas(movers, -deltas)
+    yield f"ranking.update_2k[{n}]", update
+
+    asset_index = AssetIndex(fleet)
+    ids = asset_ids(rng.integers(1, n + 1, 256))
+    yield f"index.build[{n}]", lambda: AssetIndex(fleet)
+    yield f"index.position[{n}]", lambda: [asset_index.position(asset_id) for asset_id in ids]
+    yield f"index.search[{n}]", lambda: asset_index.search("AST-12")
+    yield f"index.filter[{n}]", lambda: asset_index.filter(TABLE_FILTERS)
+    yield f"table.query_page[{n}]", lambda: query_page(fleet, asset_index.filter(TABLE_FILTERS),
+                                                       "replacement_cost", True, page=3, page_size=50)
+
+    survival = FleetSurvival.from_fleet(DEFAULT_SURVIVAL, fleet)
+    yield f"survival.expected_days[{n}]", lambda: survival.expected_days(now=FLEET_NOW)
+    yield f"survival.lookup[{n}]", lambda: survival.expected_days(movers[:20], now=FLEET_NOW)
+
+    features = synthesize_features(probs, seed=SEED)
+    engine.bind(features)
+    position = int(rng.integers(0, n))
+
+    def score_asset():
+        engine.invalidate([position])
+        return engine.score_asset(position)
+    yield f"scoring.single[{n}]", score_asset
+    yield f"scoring.batch[{n}]", lambda: engine.predict(features)
+    engine.bind(features[:0])     # drop the bound matrix before the next size
+
+
+def _crew_cases():
+    fleet = generate_fleet(FLEET_SIZES[0], seed=SEED, now=FLEET_NOW)
+    for n_crews, n_orders in CREW_SIZES:
+        crews = generate_crews(n_crews, seed=SEED)
+        orders = work_orders_from_fleet(fleet, top_risk_positions(fleet, n_orders))
+        yield f"crews.optimize[{n_crews}x{n_orders}]", lambda crews=crews, orders=orders: optimize_schedule(crews, orders)
+
+
+def _survival_cases(n_records):
+    fleet = generate_fleet(n_records, seed=SEED, now=FLEET_NOW)
+    type_codes = fleet["asset_type"].cat.codes.to_numpy()
+    probs = fleet["failure_probability"].to_numpy()
+    durations, events = simulate_failures(type_codes, probs, seed=SEED)
+    yield f"survival.fit[{n_records}]", lambda: WeibullSurvival.fit(type_codes, probs, durations, events)
+
+
+def _threshold_cases(n):
+    fleet = generate_fleet(n, seed=SEED, now=FLEET_NOW)
+    probs = fleet["failure_probability"].to_numpy()
+    outcomes = np.random.default_rng(SEED).random(n) < probs
+    costs = fleet["replacement_cost"].to_numpy(), fleet["maintenance_cost"].to_numpy()
+    yield f"thresholds.curve[{n}]", lambda: ThresholdOptimizer(probs, outcomes, *costs).curve()
+
+
+def _roi_cases():
+    yield "roi.summary", lambda: roi_summary(BUSINESS_IMPACT["potential_savings"])
+    fleet = generate_fleet(FLEET_SIZES[0], seed=SEED, now=FLEET_NOW)
+    yield f"roi.simulate[{SIMULATION_TRIALS}x{len(fleet)}]", lambda: simulate_roi(
+        fleet["failure_probability"], fleet["replacement_cost"], fleet["maintenance_cost"], seed=SEED)
+
+
+def cases(sizes=FLEET_SIZES):
+    engine = train_default_engine(seed=0)
+    for n in sizes:
+        yield from _fleet_cases(n, engine)
+    yield from _survival_cases(max(sizes))
+    yield from _threshold_cases(max(sizes))
+    yield from _crew_cases()
+    yield from _roi_cases()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": SEED,
+    }
+
+
+def run(sizes=FLEET_SIZES, repeat=7, warmup=1, min_time=0.05, only=None, stream=None):
+    """Run every case whose name contains one of ``only`` (default: all)."""
+    results = {}
+    for name, function in cases(sizes):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = measure(function, repeat, warmup, min_time)
+        if stream is not None:
+            stats = results[name]
+            print(f"{name:<34} median {_format(stats['median']):>10}  p95 {_format(stats['p95']):>10}  "
+                  f"x{stats['number']}", file=stream, flush=True)
+    return {"environment": environment(), "settings": {"repeat": repeat, "warmup": warmup, "min_time": min_time,
+                                                       "sizes": list(sizes)}, "results": results}
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Per-case median ratios (current / baseline) and the names that regressed."""
+    rows, regressions = [], []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before, after = baseline["results"][name]["median"], current["results"][name]["median"]
+        ratio = after / before if before else math.inf
+        status = "regressed" if ratio > 1 + threshold else "improved" if ratio < 1 / (1 + threshold) else "ok"
+        if status == "regressed":
+            regressions.append(name)
+        rows.append((name, before, after, ratio, status))
+    return rows, regressions
+
+
+def _format(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's data and compute paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--output", default=None, help="JSON file (default: stdout)")
+    run_parser.add_argument("--sizes", type=lambda text: [int(n) for n in text.split(",")], default=list(FLEET_SIZES))
+    run_parser.add_argument("--quick", action="store_true", help="skip the 1M-asset fleet and sample fewer times")
+    run_parser.add_argument("--repeat", type=int, default=7)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--min-time", type=float, default=0.05)
+    run_parser.add_argument("--only", nargs="*", default=None, help="substrings of case names to run")
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="allowed median slowdown, as a fraction (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        sizes, repeat = args.sizes, args.repeat
+        if args.quick:
+            sizes, repeat = [n for n in sizes if n < 1_000_000], min(repeat, 3)
+        results = run(sizes, repeat, args.warmup, args.min_time, args.only, stream=sys.stderr)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold)
+    print(f"{'case':<34} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, before, after, ratio, status in rows:
+        print(f"{name:<34} {_format(before):>10} {_format(after):>10} {ratio:7.2f}  {status}")
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"Not in current run: {', '.join(missing)}")
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} "
+          f"({baseline['environment'].get('commit') or '?'} -> {current['environment'].get('commit') or '?'})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
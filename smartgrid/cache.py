@@ -0,0 +1,126 @@
+"""Process-wide LRU cache shared by every Streamlit session in a pod."""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _is_mapped(array):
+    # Views (including the plain ndarrays pandas wraps around a memmap) chain back through ``.base``
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def estimate_bytes(value):
+    """Heap bytes held by a cached value (memory-mapped arrays count as zero)."""
+    if isinstance(value, np.ndarray):
+        return 0 if _is_mapped(value) else value.nbytes
+    if isinstance(value, pd.DataFrame):
+        total = 0
+        for name in value.columns:
+            column = value[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                total += estimate_bytes(column.array.codes)
+            else:
+                total += estimate_bytes(column.to_numpy())
+        return total
+    if hasattr(value, "memory_bytes"):
+        return value.memory_bytes()
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    """Thread-safe LRU with per-entry TTL and versioned invalidation.
+
+    Each entry is stored under a name together with the version it was built
+    for (e.g. a snapshot or model version). Asking for the same name with a
+    different version is a miss that replaces the stale entry, so publishing
+    a new snapshot invalidates exactly the entries derived from it. Concurrent
+    misses on one name build the value once; other callers wait for it.
+    """
+
+    def __init__(self, max_entries=64, default_ttl=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._building = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, name, version, now):
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        entry_version, value, expires, _ = entry
+        if entry_version != version or (expires is not None and now >= expires):
+            del self._entries[name]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(name)
+        return entry
+
+    def get_or_create(self, name, factory, version=None, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        while True:
+            with self._lock:
+                entry = self._lookup(name, version, time.monotonic())
+                if entry is not None:
+                    self.hits += 1
+                    return entry[1]
+                building = self._building.get(name)
+                if building is None:
+                    self.misses += 1
+                    building = self._building[name] = threading.Event()
+                    break
+            building.wait()
+
+        try:
+            value = factory()
+            with self._lock:
+                expires = None if ttl is None else time.monotonic() + ttl
+                self._entries[name] = (version, value, expires, estimate_bytes(value))
+                self._entries.move_to_end(name)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return value
+        finally:
+            with self._lock:
+                del self._building[name]
+            building.set()
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self.evictions += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(name, None) is not None:
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes": sum(entry[3] for entry in self._entries.values()),
+                "versions": {name: entry[0] for name, entry in self._entries.items()},
+            }
+
+
+shared_cache = SharedCache()
@@ -0,0 +1,11 @@
+"""Static reference figures shown across the dashboard pages."""
+
+BUSINESS_IMPACT = {
+    "total_assets_monitored": 9247,
+    "high_risk_identified": 146,
+    "percentage_high_risk": 1.6,
+    "potential_savings": 2300000,
+    "prevented_outages": 23,
+    "crew_efficiency_gain": 34,
+    "alert_fatigue_reduction": 78
+}
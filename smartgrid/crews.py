@@ -0,0 +1,363 @@
+"""Weekly maintenance crew scheduling over the highest-risk work orders.
+
+The objective is the one stated on the Crew Optimization page,
+(failure_risk x replacement_cost) + travel_time + crew_overtime, with every
+term in dollars: risk exposure of work orders left unscheduled this week,
+travel hours at ``TRAVEL_RATE`` and overtime hours at ``OVERTIME_RATE``.
+"""
+import itertools
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from smartgrid import routing
+from smartgrid.fleet import ASSET_TYPES, LOCATION_SITES, LOCATIONS
+from smartgrid.metrics import timed
+
+SPECIALIZATIONS = {
+    "Transmission Maintenance": ["Transformer", "Bus", "Cable"],
+    "Distribution Repair": ["Switch", "Cable", "Capacitor Bank"],
+    "Protection Systems": ["Relay", "Circuit Breaker"],
+    "Substation Maintenance": ["Transformer", "Circuit Breaker", "Bus", "Capacitor Bank"],
+    "Underground Systems": ["Cable", "Switch"],
+    "Emergency Response": list(ASSET_TYPES),
+}
+
+# Hands-on hours for one maintenance visit, per asset type
+WORK_HOURS = {"Transformer": 12, "Circuit Breaker": 8, "Relay": 4, "Capacitor Bank": 6,
+              "Switch": 4, "Cable": 10, "Bus": 6}
+
+TRAVEL_RATE = 150.0      # $ per crew travel hour
+OVERTIME_RATE = 180.0    # $ per crew overtime hour
+REGULAR_HOURS = 40.0
+MAX_OVERTIME = 12.0
+
+EXACT_MAX_ORDERS = 10
+
+
+@dataclass
+class Crews:
+    crew_ids: list
+    specializations: list
+    home_sites: np.ndarray
+    regular_hours: np.ndarray
+    max_overtime: np.ndarray
+
+    def __len__(self):
+        return len(self.crew_ids)
+
+    @property
+    def capacity(self):
+        return self.regular_hours + self.max_overtime
+
+    @property
+    def depots(self):
+        """(latitude, longitude) arrays of each crew's home site."""
+        sites = [LOCATION_SITES[LOCATIONS[site]] for site in self.home_sites]
+        return np.array([site[0] for site in sites]), np.array([site[1] for site in sites])
+
+    def select(self, indices):
+        indices = np.asarray(indices)
+        return Crews([self.crew_ids[i] for i in indices], [self.specializations[i] for i in indices],
+                     self.home_sites[indices], self.regular_hours[indices], self.max_overtime[indices])
+
+    def can_service(self, asset_type_codes):
+        """(n_crews x n_orders) specialization match matrix."""
+        skills = np.array([[t in SPECIALIZATIONS[spec] for t in ASSET_TYPES] for spec in self.specializations])
+        return skills[:, asset_type_codes]
+
+
+def generate_crews(n_crews=23, seed=None):
+    rng = np.random.default_rng(seed)
+    specs = list(SPECIALIZATIONS)
+    return Crews(
+        crew_ids=[f"CREW-{chr(65 + i % 26)}{i + 1:02d}" for i in range(n_crews)],
+        specializations=[specs[i % len(specs)] for i in range(n_crews)],
+        home_sites=rng.integers(0, len(LOCATIONS), n_crews),
+        regular_hours=np.full(n_crews, REGULAR_HOURS),
+        max_overtime=np.full(n_crews, MAX_OVERTIME),
+    )
+
+
+@dataclass
+class WorkOrders:
+    positions: np.ndarray      # fleet row of each asset
+    type_codes: np.ndarray
+    site_codes: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    work_hours: np.ndarray
+    risk_cost: np.ndarray      # failure_probability x replacement_cost
+
+    def __len__(self):
+        return len(self.positions)
+
+
+def work_orders_from_fleet(fleet, positions):
+    rows = fleet.iloc[np.asarray(positions)]
+    type_codes = rows["asset_type"].cat.codes.to_numpy()
+    hours = np.array([WORK_HOURS[t] for t in ASSET_TYPES], dtype=np.float64)
+    return WorkOrders(
+        positions=np.asarray(positions),
+        type_codes=type_codes,
+        site_codes=rows["location"].cat.codes.to_numpy(),
+        latitude=rows["latitude"].to_numpy(np.float64),
+        longitude=rows["longitude"].to_numpy(np.float64),
+        work_hours=hours[type_codes],
+        risk_cost=rows["failure_probability"].to_numpy(np.float64) * rows["replacement_cost"].to_numpy(np.float64),
+    )
+
+
+@dataclass
+class Schedule:
+    assignment: np.ndarray     # crew index per work order, -1 = deferred
+    load_hours: np.ndarray     # work + travel hours per crew
+    travel_hours: np.ndarray   # travel hours per crew
+    overtime_hours: np.ndarray
+    costs: dict
+    method: str
+    solve_seconds: float = 0.0
+    baseline: "Schedule" = field(default=None, repr=False)
+    routes: list = field(default_factory=list, repr=False)
+
+    @property
+    def objective(self):
+        return sum(self.costs.values())
+
+    @property
+    def n_assigned(self):
+        return int((self.assignment >= 0).sum())
+
+    def crew_orders(self, crew):
+        return np.flatnonzero(self.assignment == crew)
+
+    @property
+    def route_miles(self):
+        return sum(route.miles for route in self.routes)
+
+    @property
+    def route_miles_saved(self):
+        return sum(route.miles_saved for route in self.routes)
+
+    @property
+    def route_hours_saved(self):
+        return float(routing.travel_hours(self.route_miles_saved))
+
+
+class _Problem:
+    """Dense cost tables shared by the construction and improvement phases."""
+
+    def __init__(self, crews, orders, travel_hours=None):
+        self.crews = crews
+        self.orders = orders
+        if travel_hours is None:
+            # Round trip from the crew's depot to the asset, for assignment costs
+            depot_lat, depot_lon = crews.depots
+            miles = routing.road_miles(depot_lat, depot_lon, orders.latitude, orders.longitude)
+            travel_hours = 2 * routing.travel_hours(miles)
+        self.travel = travel_hours
+        self.compatible = crews.can_service(orders.type_codes)
+        self.job_hours = orders.work_hours[None, :] + self.travel
+        self.regular = crews.regular_hours
+        self.capacity = crews.capacity
+        self.risk = orders.risk_cost
+
+    def overtime_cost(self, load, crew):
+        return OVERTIME_RATE * np.maximum(0.0, load - self.regular[crew])
+
+    def evaluate(self, assignment, method, started=None):
+        n_crews = len(self.crews)
+        assigned = np.flatnonzero(assignment >= 0)
+        crews_of = assignment[assigned]
+        load = np.bincount(crews_of, weights=self.job_hours[crews_of, assigned], minlength=n_crews)
+        travel = np.bincount(crews_of, weights=self.travel[crews_of, assigned], minlength=n_crews)
+        overtime = np.maximum(0.0, load - self.regular)
+        costs = {
+            "deferred_risk": float(self.risk[assignment < 0].sum()),
+            "travel": float(TRAVEL_RATE * travel.sum()),
+            "overtime": float(OVERTIME_RATE * overtime.sum()),
+        }
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        return Schedule(assignment.copy(), load, travel, overtime, costs, method, elapsed)
+
+    def plan_routes(self, schedule):
+        # Visiting order per crew; the baseline is the assignment (priority) order
+        depot_lat, depot_lon = self.crews.depots
+        schedule.routes = []
+        for crew in range(len(self.crews)):
+            jobs = schedule.crew_orders(crew)
+            route = routing.plan_route((depot_lat[crew], depot_lon[crew]),
+                                       self.orders.latitude[jobs], self.orders.longitude[jobs])
+            route.stops = jobs[route.stops]
+            schedule.routes.append(route)
+        return schedule
+
+
+def _greedy(problem):
+    # Highest risk first; each order goes to the cheapest feasible crew if
+    # serving it costs less than deferring it.
+    n_crews, n_orders = problem.job_hours.shape
+    assignment = np.full(n_orders, -1)
+    load = np.zeros(n_crews)
+    crew_index = np.arange(n_crews)
+    for j in np.argsort(-problem.risk, kind="stable"):
+        new_load = load + problem.job_hours[:, j]
+        feasible = problem.compatible[:, j] & (new_load <= problem.capacity)
+        if not feasible.any():
+            continue
+        marginal = (TRAVEL_RATE * problem.travel[:, j]
+                    + problem.overtime_cost(new_load, crew_index) - problem.overtime_cost(load, crew_index))
+        marginal[~feasible] = np.inf
+        crew = int(np.argmin(marginal))
+        if marginal[crew] < problem.risk[j]:
+            assignment[j] = crew
+            load[crew] = new_load[crew]
+    return assignment, load
+
+
+def _local_search(problem, assignment, load, max_passes=20, time_limit=0.8):
+    # Relocate and swap moves, first-improvement, until a pass finds nothing
+    n_crews, n_orders = problem.job_hours.shape
+    crew_index = np.arange(n_crews)
+    deadline = time.perf_counter() + time_limit
+    eps = 1e-6
+    for _ in range(max_passes):
+        improved = False
+        for j in range(n_orders):
+            if time.perf_counter() > deadline:
+                return assignment, load
+            a = assignment[j]
+            # Relocate j to another crew (or defer it / schedule it if deferred)
+            if a >= 0:
+                removed_load = load[a] - problem.job_hours[a, j]
+                removal_gain = (TRAVEL_RATE * problem.travel[a, j] + problem.overtime_cost(load[a], a)
+                                - problem.overtime_cost(removed_load, a))
+            else:
+                removal_gain = problem.risk[j]
+            new_load = load + problem.job_hours[:, j]
+            insert = (TRAVEL_RATE * problem.travel[:, j]
+                      + problem.overtime_cost(new_load, crew_index) - problem.overtime_cost(load, crew_index))
+            insert[~(problem.compatible[:, j] & (new_load <= problem.capacity))] = np.inf
+            if a >= 0:
+                insert[a] = np.inf
+            delta = insert - removal_gain
+            best = int(np.argmin(delta))
+            defer_delta = problem.risk[j] - removal_gain if a >= 0 else np.inf
+            if min(delta[best], defer_delta) < -eps:
+                if a >= 0:
+                    load[a] = removed_load
+                if delta[best] <= defer_delta:
+                    assignment[j] = best
+                    load[best] = new_load[best]
+                else:
+                    assignment[j] = -1
+                improved = True
+                continue
+            if a < 0:
+                continue
+
+            # Swap j (on crew a) with an order k on another crew or deferred
+            others = np.flatnonzero(assignment != a)
+            if not len(others):
+                continue
+            b = assignment[others]
+            scheduled = b >= 0
+            b_idx = np.where(scheduled, b, 0)
+            load_a = load[a] - problem.job_hours[a, j] + problem.job_hours[a, others]
+            load_b = load[b_idx] - problem.job_hours[b_idx, others] + problem.job_hours[b_idx, j]
+            ok = problem.compatible[a, others] & (load_a <= problem.capacity[a])
+            ok &= ~scheduled | (problem.compatible[b_idx, j] & (load_b <= problem.capacity[b_idx]))
+            delta = (TRAVEL_RATE * (problem.travel[a, others] - problem.travel[a, j])
+                     + problem.overtime_cost(load_a, a) - problem.overtime_cost(load[a], a))
+            delta += np.where(
+                scheduled,
+                TRAVEL_RATE * (problem.travel[b_idx, j] - problem.travel[b_idx, others])
+                + problem.overtime_cost(load_b, b_idx) - problem.overtime_cost(load[b_idx], b_idx),
+                problem.risk[j] - problem.risk[others],
+            )
+            delta[~ok] = np.inf
+            best = int(np.argmin(delta))
+            if delta[best] < -eps:
+                k, kb = others[best], b[best]
+                load[a] = load_a[best]
+                if kb >= 0:
+                    load[kb] = load_b[best]
+                assignment[j], assignment[k] = kb, a
+                improved = True
+        if not improved:
+            break
+    return assignment, load
+
+
+def _exact(problem):
+    # Depth-first branch and bound over (crew or defer) for every order
+    n_crews, n_orders = problem.job_hours.shape
+    order = np.argsort(-problem.risk, kind="stable")
+    cheapest = np.where(problem.compatible, TRAVEL_RATE * problem.travel, np.inf).min(axis=0)
+    floor = np.minimum(problem.risk, cheapest)[order]
+    remaining_floor = np.concatenate([np.cumsum(floor[::-1])[::-1], [0.0]])
+    best = {"cost": np.inf, "assignment": None}
+    assignment = np.full(n_orders, -1)
+    load = np.zeros(n_crews)
+
+    def partial_cost():
+        return float(OVERTIME_RATE * np.maximum(0.0, load - problem.regular).sum())
+
+    def search(depth, cost):
+        if cost + remaining_floor[depth] >= best["cost"]:
+            return
+        if depth == n_orders:
+            best["cost"], best["assignment"] = cost, assignment.copy()
+            return
+        j = order[depth]
+        for crew in itertools.chain(range(n_crews), [-1]):
+            if crew < 0:
+                assignment[j] = -1
+                search(depth + 1, cost + problem.risk[j])
+                continue
+            if not problem.compatible[crew, j] or load[crew] + problem.job_hours[crew, j] > problem.capacity[crew]:
+                continue
+            before = partial_cost()
+            load[crew] += problem.job_hours[crew, j]
+            assignment[j] = crew
+            search(depth + 1, cost + TRAVEL_RATE * problem.travel[crew, j] + partial_cost() - before)
+            load[crew] -= problem.job_hours[crew, j]
+        assignment[j] = -1
+
+    search(0, 0.0)
+    return best["assignment"]
+
+
+def _baseline(problem):
+    # Unoptimized dispatch: priority order, round-robin over qualified crews,
+    # ignoring geography and overtime.
+    n_crews, n_orders = problem.job_hours.shape
+    assignment = np.full(n_orders, -1)
+    load = np.zeros(n_crews)
+    cursor = 0
+    for j in np.argsort(-problem.risk, kind="stable"):
+        for step in range(n_crews):
+            crew = (cursor + step) % n_crews
+            if problem.compatible[crew, j] and load[crew] + problem.job_hours[crew, j] <= problem.capacity[crew]:
+                assignment[j] = crew
+                load[crew] += problem.job_hours[crew, j]
+                cursor = crew + 1
+                break
+    return assignment
+
+
+@timed("crew_optimization")
+def optimize_schedule(crews, orders, exact=None, travel_hours=None, time_limit=0.8):
+    """Assign work orders to crews; exact search for tiny instances, else greedy + local search."""
+    started = time.perf_counter()
+    problem = _Problem(crews, orders, travel_hours)
+    exact = len(orders) <= EXACT_MAX_ORDERS if exact is None else exact
+    if exact:
+        schedule = problem.evaluate(_exact(problem), "exact branch-and-bound", started)
+    else:
+        assignment, load = _greedy(problem)
+        assignment, _ = _local_search(problem, assignment, load, time_limit=time_limit)
+        schedule = problem.evaluate(assignment, "greedy + local search", started)
+    schedule.baseline = problem.evaluate(_baseline(problem), "round-robin dispatch")
+    return problem.plan_routes(schedule)
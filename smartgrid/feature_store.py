@@ -0,0 +1,154 @@
+"""In-memory rolling-window feature store with incrementally maintained statistics."""
+import numpy as np
+
+from smartgrid.features import FEATURE_MEAN, N_FEATURES
+
+STATISTICS = ("mean", "std", "min", "max", "ewma", "slope")
+
+
+class FeatureStore:
+    """Per-asset, per-sensor ring buffers with O(1) rolling statistics.
+
+    Every (asset, sensor) pair owns a preallocated ring of the last ``window``
+    readings. Sum, sum of squares and the time-weighted sum used for the
+    least-squares slope are updated by adding the new reading and subtracting
+    the evicted one, and the EWMA is a single blend; min/max are updated in
+    place and rescanned only for the rows whose evicted reading was the
+    extreme. Accumulators are re-derived from the rings every
+    ``resync_every`` readings to bound floating-point drift.
+
+    ``push`` accepts telemetry record arrays, so the store can be used
+    directly as an ``IngestPipeline`` sink. Non-finite readings (dropped
+    sensor values arrive as NaN) would poison the accumulators for good, so
+    they are discarded and counted in ``invalid``.
+    """
+
+    def __init__(self, n_assets, window=32, ewma_alpha=0.2, resync_every=1 << 26):
+        self.n_assets = n_assets
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+        self.resync_every = resync_every
+        shape = (n_assets, N_FEATURES)
+        self._ring = np.zeros(shape + (window,), dtype=np.float32)
+        self._head = np.zeros(shape, dtype=np.int32)
+        self._count = np.zeros(shape, dtype=np.int32)
+        self._seq = np.zeros(shape, dtype=np.int64)
+        self._sum = np.zeros(shape)
+        self._sumsq = np.zeros(shape)
+        self._sum_ty = np.zeros(shape)
+        self._ewma = np.zeros(shape)
+        self._min = np.full(shape, np.inf, dtype=np.float32)
+        self._max = np.full(shape, -np.inf, dtype=np.float32)
+        self._since_resync = 0
+        self.invalid = 0
+
+    def push(self, records):
+        finite = np.isfinite(records["value"])
+        if not finite.all():
+            self.invalid += int(len(finite) - np.count_nonzero(finite))
+            records = records[finite]
+        keys = records["asset"].astype(np.int64) * N_FEATURES + records["feature"]
+        values = records["value"]
+        if len(keys) == 0:
+            return
+        # Repeated (asset, sensor) keys in one batch are applied in arrival
+        # order, one "round" per repeat, each round fully vectorized.
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        occurrence = np.arange(len(keys)) - np.repeat(starts, np.diff(np.r_[starts, len(keys)]))
+        for r in range(occurrence.max() + 1):
+            picked = order[occurrence == r]
+            self._push_unique(keys[picked], values[picked])
+        self._since_resync += len(keys)
+        if self._since_resync >= self.resync_every:
+            self.resync()
+
+    def _push_unique(self, keys, values):
+        a, f = np.divmod(keys, N_FEATURES)
+        v = values.astype(np.float64)
+        head, count, seq = self._head[a, f], self._count[a, f], self._seq[a, f]
+        full = count == self.window
+        old = np.where(full, self._ring[a, f, head], 0.0).astype(np.float64)
+
+        self._sum[a, f] += v - old
+        self._sumsq[a, f] += v * v - old * old
+        self._sum_ty[a, f] += seq * v - (seq - self.window) * old
+        self._ewma[a, f] = np.where(seq == 0, v, self.ewma_alpha * v + (1 - self.ewma_alpha) * self._ewma[a, f])
+
+        self._ring[a, f, head] = values
+        self._head[a, f] = (head + 1) % self.window
+        self._count[a, f] = np.minimum(count + 1, self.window)
+        self._seq[a, f] = seq + 1
+
+        cur_min, cur_max = self._min[a, f], self._max[a, f]
+        self._min[a, f] = np.minimum(cur_min, values)
+        self._max[a, f] = np.maximum(cur_max, values)
+        rescan_min = full & (old <= cur_min) & (values > old)
+        rescan_max = full & (old >= cur_max) & (values < old)
+        if rescan_min.any():
+            self._min[a[rescan_min], f[rescan_min]] = self._ring[a[rescan_min], f[rescan_min]].min(axis=1)
+        if rescan_max.any():
+            self._max[a[rescan_max], f[rescan_max]] = self._ring[a[rescan_max], f[rescan_max]].max(axis=1)
+
+    def resync(self):
+        """Recompute accumulators exactly from the rings and rebase time indices."""
+        n = self._count
+        # Chronological position of every ring slot: 0 = oldest retained reading
+        slots = np.arange(self.window)
+        age_order = (slots - self._head[..., None]) % self.window - (self.window - n[..., None])
+        valid = age_order >= 0
+        values = np.where(valid, self._ring, 0.0).astype(np.float64)
+        self._sum = values.sum(axis=2)
+        self._sumsq = (values * values).sum(axis=2)
+        self._sum_ty = (values * np.where(valid, age_order, 0)).sum(axis=2)
+        self._seq = n.astype(np.int64)
+        self._min = np.where(valid, self._ring, np.inf).min(axis=2).astype(np.float32)
+        self._max = np.where(valid, self._ring, -np.inf).max(axis=2).astype(np.float32)
+        self._since_resync = 0
+
+    # Statistics, each an (n_assets x N_FEATURES) array
+    def statistic(self, name):
+        n = self._count.astype(np.float64)
+        seen = n > 0
+        if name == "mean":
+            return np.divide(self._sum, n, out=np.broadcast_to(FEATURE_MEAN, n.shape).copy(), where=seen)
+        if name == "std":
+            mean = np.divide(self._sum, n, out=np.zeros_like(n), where=seen)
+            var = np.divide(self._sumsq, n, out=np.zeros_like(n), where=seen) - mean * mean
+            return np.sqrt(np.maximum(var, 0.0))
+        if name == "min":
+            return np.where(seen, self._min, FEATURE_MEAN)
+        if name == "max":
+            return np.where(seen, self._max, FEATURE_MEAN)
+        if name == "ewma":
+            return np.where(self._seq > 0, self._ewma, FEATURE_MEAN)
+        if name == "slope":
+            # Least-squares slope per reading over time indices seq-n .. seq-1
+            t_first = (self._seq - n).astype(np.float64)
+            s_t = n * t_first + n * (n - 1) / 2
+            s_tt = n * t_first ** 2 + t_first * n * (n - 1) + (n - 1) * n * (2 * n - 1) / 6
+            denom = n * s_tt - s_t * s_t
+            numer = n * self._sum_ty - s_t * self._sum
+            return np.divide(numer, denom, out=np.zeros_like(n), where=denom > 0)
+        raise KeyError(f"Unknown statistic: {name}")
+
+    def matrix(self, stat="ewma"):
+        """Contiguous float32 (n_assets x N_FEATURES) matrix for batch scoring."""
+        return np.ascontiguousarray(self.statistic(stat), dtype=np.float32)
+
+    def feature_matrix(self, stats=STATISTICS):
+        """All requested statistics side by side: (n_assets x N_FEATURES * len(stats))."""
+        out = np.empty((self.n_assets, N_FEATURES * len(stats)), dtype=np.float32)
+        for i, stat in enumerate(stats):
+            out[:, i * N_FEATURES:(i + 1) * N_FEATURES] = self.statistic(stat)
+        return out
+
+    def memory_bytes(self):
+        arrays = (self._ring, self._head, self._count, self._seq, self._sum, self._sumsq,
+                  self._sum_ty, self._ewma, self._min, self._max)
+        return sum(arr.nbytes for arr in arrays)
+
+    @property
+    def bytes_per_asset(self):
+        return self.memory_bytes() / max(self.n_assets, 1)
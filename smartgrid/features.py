@@ -0,0 +1,96 @@
+"""Sensor feature catalog and synthetic telemetry for the monitored fleet."""
+import numpy as np
+
+from smartgrid.fleet import RISK_LOGIT_MEAN
+
+ML_FEATURES = {
+    "Electrical Parameters": [
+        "Voltage THD (%)", "Current Unbalance (%)", "Power Factor", "Load Factor (%)",
+        "Harmonics 3rd/5th/7th", "Neutral Current (A)", "Insulation Resistance (MΩ)"
+    ],
+    "Thermal Characteristics": [
+        "Operating Temperature (°C)", "Temperature Rise Rate (°C/hr)", "Hot Spot Temperature",
+        "Ambient Temperature Delta", "Cooling System Efficiency (%)", "Oil Temperature (transformers)"
+    ],
+    "Mechanical Indicators": [
+        "Vibration Level (mm/s)", "Contact Resistance (μΩ)", "Operating Time (ms)",
+        "SF6 Gas Pressure (bar)", "Mechanism Travel Time", "Contact Wear Pattern"
+    ],
+    "Environmental Factors": [
+        "Humidity Level (%)", "Contamination Index", "UV Exposure Hours",
+        "Salt Deposit Density", "Wind Loading Factor", "Seismic Activity Level"
+    ],
+    "Operational History": [
+        "Fault Count (last 12 months)", "Operating Cycles", "Maintenance Intervals",
+        "Load History Variance", "Emergency Operations", "Manufacturer Age (years)"
+    ]
+}
+
+# Per-sensor (nominal mean, nominal std, valid low, valid high, risk weight).
+# The risk weight is the sensor's pull on the failure logit per standard
+# deviation; negative weights mean low readings are the dangerous ones.
+FEATURE_SPECS = {
+    "Voltage THD (%)": (2.5, 0.8, 0.0, 20.0, 0.14),
+    "Current Unbalance (%)": (1.5, 0.6, 0.0, 25.0, 0.08),
+    "Power Factor": (0.95, 0.02, 0.0, 1.0, -0.05),
+    "Load Factor (%)": (65.0, 12.0, 0.0, 150.0, 0.28),
+    "Harmonics 3rd/5th/7th": (3.0, 1.0, 0.0, 25.0, 0.06),
+    "Neutral Current (A)": (12.0, 5.0, 0.0, 500.0, 0.04),
+    "Insulation Resistance (MΩ)": (1500.0, 400.0, 0.0, 10000.0, -0.18),
+    "Operating Temperature (°C)": (65.0, 8.0, -40.0, 150.0, 0.40),
+    "Temperature Rise Rate (°C/hr)": (0.5, 0.3, -20.0, 20.0, 0.16),
+    "Hot Spot Temperature": (85.0, 10.0, -40.0, 200.0, 0.22),
+    "Ambient Temperature Delta": (25.0, 6.0, -20.0, 100.0, 0.05),
+    "Cooling System Efficiency (%)": (92.0, 4.0, 0.0, 100.0, -0.10),
+    "Oil Temperature (transformers)": (60.0, 7.0, -40.0, 150.0, 0.12),
+    "Vibration Level (mm/s)": (2.0, 0.7, 0.0, 50.0, 0.33),
+    "Contact Resistance (μΩ)": (45.0, 10.0, 0.0, 2000.0, 0.21),
+    "Operating Time (ms)": (35.0, 4.0, 0.0, 500.0, 0.07),
+    "SF6 Gas Pressure (bar)": (6.0, 0.2, 0.0, 10.0, -0.06),
+    "Mechanism Travel Time": (120.0, 10.0, 0.0, 1000.0, 0.05),
+    "Contact Wear Pattern": (0.2, 0.1, 0.0, 1.0, 0.09),
+    "Humidity Level (%)": (55.0, 15.0, 0.0, 100.0, 0.04),
+    "Contamination Index": (0.3, 0.15, 0.0, 5.0, 0.08),
+    "UV Exposure Hours": (2200.0, 400.0, 0.0, 8760.0, 0.02),
+    "Salt Deposit Density": (0.05, 0.03, 0.0, 1.0, 0.05),
+    "Wind Loading Factor": (0.4, 0.15, 0.0, 3.0, 0.03),
+    "Seismic Activity Level": (0.1, 0.05, 0.0, 10.0, 0.01),
+    "Fault Count (last 12 months)": (1.0, 1.0, 0.0, 100.0, 0.12),
+    "Operating Cycles": (1500.0, 500.0, 0.0, 100000.0, 0.05),
+    "Maintenance Intervals": (365.0, 90.0, 0.0, 3650.0, 0.24),
+    "Load History Variance": (0.1, 0.05, 0.0, 5.0, 0.06),
+    "Emergency Operations": (0.5, 0.7, 0.0, 100.0, 0.07),
+    "Manufacturer Age (years)": (22.0, 10.0, 0.0, 80.0, 0.10),
+}
+
+FEATURE_NAMES = [name for names in ML_FEATURES.values() for name in names]
+FEATURE_GROUPS = np.repeat(np.arange(len(ML_FEATURES)), [len(names) for names in ML_FEATURES.values()])
+N_FEATURES = len(FEATURE_NAMES)
+
+_specs = np.array([FEATURE_SPECS[name] for name in FEATURE_NAMES], dtype=np.float64)
+FEATURE_MEAN, FEATURE_STD, FEATURE_LOW, FEATURE_HIGH, RISK_WEIGHTS = _specs.T
+
+
+def feature_index(name):
+    return FEATURE_NAMES.index(name)
+
+
+def standardize(features):
+    return (np.asarray(features, dtype=np.float32) - FEATURE_MEAN.astype(np.float32)) / FEATURE_STD.astype(np.float32)
+
+
+def synthesize_features(failure_probability, seed=None):
+    """Sensor readings (n_assets x N_FEATURES, engineering units) for a fleet.
+
+    Readings are Gaussian around each sensor's nominal value, with the
+    component along RISK_WEIGHTS set so that the weighted anomaly explains
+    each asset's failure logit exactly.
+    """
+    rng = np.random.default_rng(seed)
+    p = np.clip(np.asarray(failure_probability, dtype=np.float64), 1e-6, 1 - 1e-6)
+    logits = np.log(p / (1 - p))
+    noise = rng.standard_normal((len(p), N_FEATURES))
+    w = RISK_WEIGHTS
+    offset = (logits - RISK_LOGIT_MEAN - noise @ w) / (w @ w)
+    z = noise + offset[:, None] * w
+    return (FEATURE_MEAN + z * FEATURE_STD).astype(np.float32)
@@ -0,0 +1,149 @@
+"""Columnar generation and risk ranking for the monitored asset fleet."""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from smartgrid.metrics import timed
+from smartgrid.survival import DEFAULT_SURVIVAL
+
+ASSET_TYPES = ["Transformer", "Circuit Breaker", "Relay", "Capacitor Bank", "Switch", "Cable", "Bus"]
+VOLTAGE_LEVELS = ["4.16kV", "12.47kV", "25kV", "69kV", "138kV", "230kV", "500kV"]
+LOCATIONS = ["Substation Alpha", "Substation Beta", "Substation Gamma", "Substation Delta",
+             "Distribution Hub North", "Distribution Hub South", "Transmission Yard West"]
+
+# Site (latitude, longitude) and the town it serves, in LOCATIONS order
+LOCATION_SITES = {
+    "Substation Alpha": (41.7637, -72.6851, "Hartford, CT"),
+    "Substation Beta": (42.1015, -72.5898, "Springfield, MA"),
+    "Substation Gamma": (41.0534, -73.5387, "Stamford, CT"),
+    "Substation Delta": (42.3601, -71.0589, "Boston, MA"),
+    "Distribution Hub North": (42.2626, -71.8023, "Worcester, MA"),
+    "Distribution Hub South": (41.3083, -72.9279, "New Haven, CT"),
+    "Transmission Yard West": (41.5582, -73.0515, "Waterbury, CT"),
+}
+
+# Tiers are ordered from most to least urgent; a probability above the
+# matching threshold lands in that tier.
+RISK_TIERS = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+RISK_THRESHOLDS = {"CRITICAL": 0.15, "HIGH": 0.08, "MEDIUM": 0.02}
+
+FLEET_SIZE = 9247
+
+# Bump when generate_fleet's columns change so stale snapshots get rebuilt
+FLEET_SCHEMA_VERSION = 3
+
+# Spread of asset coordinates around their site, in degrees (~5 miles)
+SITE_SPREAD_DEGREES = 0.08
+
+# Failure probabilities are logit-normal, calibrated so tier shares match the
+# monitored fleet (~0.25% critical, ~1.6% high-risk, ~20% medium).
+RISK_LOGIT_MEAN = -4.75
+RISK_LOGIT_STD = 1.075
+
+
+def risk_tier_codes(failure_probability):
+    """Map probabilities to codes into RISK_TIERS (0 = CRITICAL)."""
+    cutoffs = [RISK_THRESHOLDS[tier] for tier in reversed(RISK_TIERS[:-1])]
+    above = np.searchsorted(cutoffs, failure_probability, side="left")
+    return (len(cutoffs) - above).astype(np.int8)
+
+
+def risk_tiers(failure_probability):
+    codes = risk_tier_codes(failure_probability)
+    return pd.Categorical.from_codes(codes, categories=RISK_TIERS, ordered=True)
+
+
+def days_to_failure(type_codes, failure_probability, days_since_maintenance, model=DEFAULT_SURVIVAL):
+    """Expected remaining life in whole days from the asset type's survival curve."""
+    expected = model.expected_days(type_codes, failure_probability, days_since_maintenance)
+    return np.maximum(1, expected).astype(np.int32)
+
+
+def apply_scores(fleet, failure_probability, now=None):
+    """Overwrite the fleet's probabilities, tiers and days to failure with fresh model scores."""
+    fleet["failure_probability"] = np.asarray(failure_probability, dtype=np.float32)
+    fleet["risk_level"] = risk_tiers(fleet["failure_probability"].to_numpy())
+    age = np.datetime64(now or datetime.now(), "s") - fleet["last_maintenance"].to_numpy()
+    fleet["days_to_failure"] = days_to_failure(fleet["asset_type"].cat.codes.to_numpy(),
+                                               fleet["failure_probability"].to_numpy(), age / np.timedelta64(1, "D"))
+    return fleet
+
+
+def _categorical(rng, labels, n):
+    codes = rng.integers(0, len(labels), n, dtype=np.int8)
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+@timed("generate_fleet")
+def generate_fleet(n_assets=FLEET_SIZE, seed=None, now=None):
+    """Build the whole fleet in one batch as a column-oriented DataFrame.
+
+    Row ``i`` holds asset number ``i + 1``; use ``asset_ids`` to format IDs
+    for the rows that are actually displayed.
+    """
+    rng = np.random.default_rng(seed)
+    now = np.datetime64(now or datetime.now(), "s")
+
+    logits = rng.normal(RISK_LOGIT_MEAN, RISK_LOGIT_STD, n_assets)
+    failure_prob = 1.0 / (1.0 + np.exp(-logits))
+    days_since_maintenance = rng.integers(30, 801, n_assets)
+    asset_type = _categorical(rng, ASSET_TYPES, n_assets)
+    location = _categorical(rng, LOCATIONS, n_assets)
+    site_lat, site_lon = (np.array([LOCATION_SITES[name][i] for name in LOCATIONS]) for i in range(2))
+    jitter = rng.normal(0.0, SITE_SPREAD_DEGREES, (2, n_assets))
+
+    return pd.DataFrame({
+        "asset_num": np.arange(1, n_assets + 1, dtype=np.uint32),
+        "asset_type": asset_type,
+        "voltage_level": _categorical(rng, VOLTAGE_LEVELS, n_assets),
+        "location": location,
+        "latitude": (site_lat[location.codes] + jitter[0]).astype(np.float32),
+        "longitude": (site_lon[location.codes] + jitter[1]).astype(np.float32),
+        "failure_probability": failure_prob.astype(np.float32),
+        "risk_level": risk_tiers(failure_prob),
+        "days_to_failure": days_to_failure(asset_type.codes, failure_prob, days_since_maintenance),
+        "maintenance_cost": rng.integers(5000, 85001, n_assets, dtype=np.int32),
+        "replacement_cost": rng.integers(50000, 1200001, n_assets, dtype=np.int32),
+        "criticality_score": rng.uniform(0.1, 1.0, n_assets).astype(np.float32),
+        "last_maintenance": now - days_since_maintenance.astype("timedelta64[D]"),
+    })
+
+
+def asset_ids(asset_nums):
+    return [f"AST-{int(num):04d}" for num in asset_nums]
+
+
+def parse_asset_id(asset_id):
+    return int(asset_id.rsplit("-", 1)[1])
+
+
+# Risk ranking
+def rank_by_risk(fleet):
+    """Row positions of the whole fleet, highest failure probability first."""
+    return np.argsort(-fleet["failure_probability"].to_numpy(), kind="stable")
+
+
+def top_risk_positions(fleet, k, tiers=None):
+    """Row positions of the ``k`` riskiest assets, optionally limited to tiers."""
+    probs = fleet["failure_probability"].to_numpy()
+    candidates = None
+    if tiers is not None:
+        candidates = np.flatnonzero(fleet["risk_level"].isin(tiers).to_numpy())
+        probs = probs[candidates]
+    k = min(k, len(probs))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(-probs, k - 1)[:k]
+    top = top[np.argsort(-probs[top], kind="stable")]
+    return top if candidates is None else candidates[top]
+
+
+def asset_records(fleet, positions):
+    """Materialize selected rows as the per-asset dicts the dashboard renders."""
+    rows = fleet.iloc[positions]
+    records = rows.to_dict("records")
+    for record, asset_id in zip(records, asset_ids(rows["asset_num"])):
+        record["asset_id"] = asset_id
+        record["last_maintenance"] = record["last_maintenance"].to_pydatetime()
+    return records
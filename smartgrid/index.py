@@ -0,0 +1,131 @@
+"""Asset lookup by ID and inverted indexes over the categorical fleet columns."""
+import numpy as np
+
+INDEXED_COLUMNS = ("asset_type", "voltage_level", "location", "risk_level")
+
+ID_PREFIX = "AST-"
+ID_WIDTH = 4
+
+
+def _test_bits(bitmap, rows):
+    return (bitmap[rows >> 3] >> (rows & 7).astype(np.uint8)) & 1 == 1
+
+
+class AssetIndex:
+    """Read-only indexes built once per fleet snapshot.
+
+    ``asset_num`` maps to its row through a direct-address table (one int32
+    slot per possible number), so ID lookups never scan. Each indexed
+    categorical column keeps, per category, a sorted array of row positions
+    and a packed bitmap. Combined filters start from the most selective
+    column's positions and probe the other columns' bitmaps, so the cost
+    follows the smallest matching set rather than the fleet.
+    """
+
+    def __init__(self, fleet, columns=INDEXED_COLUMNS):
+        self.n_assets = len(fleet)
+        nums = fleet["asset_num"].to_numpy()
+        self._nums_sorted = np.sort(nums)
+        self._row_of = np.full(int(nums.max()) + 1 if len(nums) else 1, -1, dtype=np.int32)
+        self._row_of[nums] = np.arange(len(nums), dtype=np.int32)
+        self.categories = {}
+        self._postings = {}
+        self._bitmaps = {}
+        for name in columns:
+            column = fleet[name].cat
+            codes = column.codes.to_numpy()
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(column.categories)))])
+            self.categories[name] = [str(c) for c in column.categories]
+            self._postings[name] = {label: order[bounds[i]:bounds[i + 1]]
+                                    for i, label in enumerate(self.categories[name])}
+            self._bitmaps[name] = {label: np.packbits(codes == i, bitorder="little")
+                                   for i, label in enumerate(self.categories[name])}
+
+    def __len__(self):
+        return self.n_assets
+
+    def memory_bytes(self):
+        return self._row_of.nbytes + self._nums_sorted.nbytes + sum(
+            rows.nbytes for index in (self._postings, self._bitmaps)
+            for postings in index.values() for rows in postings.values())
+
+    # ID lookup
+    def position(self, asset_id):
+        """Row of ``asset_id`` (``"AST-0042"`` or 42), or None."""
+        num = asset_id if isinstance(asset_id, (int, np.integer)) else _parse_number(asset_id)
+        if num is None or not 0 <= num < len(self._row_of):
+            return None
+        row = int(self._row_of[num])
+        return row if row >= 0 else None
+
+    def positions(self, asset_nums):
+        return self._row_of[np.asarray(asset_nums)]
+
+    def search(self, query, limit=50):
+        """Rows whose asset ID starts with ``query`` (with or without the prefix), by ID."""
+        digits = query.strip().upper()
+        if digits.startswith(ID_PREFIX):
+            digits = digits[len(ID_PREFIX):]
+        if not digits.isdigit():
+            return np.empty(0, dtype=np.int32) if digits else self.positions(self._nums_sorted[:limit])
+        # IDs are zero-padded to ID_WIDTH, so a prefix selects one range of
+        # numbers for each possible ID length.
+        found = []
+        max_width = max(ID_WIDTH, len(str(int(self._nums_sorted[-1])))) if self.n_assets else ID_WIDTH
+        for width in range(max(ID_WIDTH, len(digits)), max_width + 1):
+            if width > ID_WIDTH and digits[0] == "0":
+                break
+            scale = 10 ** (width - len(digits))
+            low, high = int(digits) * scale, (int(digits) + 1) * scale
+            if width > ID_WIDTH:
+                low = max(low, 10 ** (width - 1))
+            start, stop = np.searchsorted(self._nums_sorted, [low, high])
+            found.append(self._nums_sorted[start:min(stop, start + limit)])
+            if sum(len(f) for f in found) >= limit:
+                break
+        nums = np.concatenate(found)[:limit] if found else self._nums_sorted[:0]
+        return self.positions(nums)
+
+    # Inverted indexes
+    def rows_where(self, name, values):
+        """Sorted rows whose ``name`` column is any of ``values``."""
+        postings = self._postings[name]
+        parts = [postings[value] for value in values if value in postings]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.sort(np.concatenate(parts))
+
+    def _size(self, name, values):
+        postings = self._postings[name]
+        return sum(len(postings[value]) for value in values if value in postings)
+
+    def filter(self, filters):
+        """Rows matching every non-empty ``{column: [values]}`` filter, in row order."""
+        active = sorted(((name, values) for name, values in filters.items() if values),
+                        key=lambda item: self._size(*item))
+        if not active:
+            return np.arange(self.n_assets, dtype=np.int32)
+        rows = self.rows_where(*active[0])
+        for name, values in active[1:]:
+            if not len(rows):
+                break
+            bitmaps = self._bitmaps[name]
+            keep = np.zeros(len(rows), dtype=bool)
+            for value in values:
+                if value in bitmaps:
+                    keep |= _test_bits(bitmaps[value], rows)
+            rows = rows[keep]
+        return rows
+
+    def count(self, filters):
+        return len(self.filter(filters))
+
+
+def _parse_number(asset_id):
+    text = str(asset_id).strip().upper()
+    if text.startswith(ID_PREFIX):
+        text = text[len(ID_PREFIX):]
+    return int(text) if text.isdigit() else None
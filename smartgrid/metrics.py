@@ -0,0 +1,333 @@
+"""In-process counters, gauges and latency histograms with a Prometheus endpoint.
+
+Histograms use an HDR-style log-linear layout over integer nanoseconds: 16
+linear sub-buckets per power of two, so the bucket index of an observation
+is a ``bit_length`` and a shift and quantiles are accurate to ~6%. Recording
+one observation is a few integer operations on a per-thread shard with no
+lock, and the exporter folds the fine buckets into a conventional ``le``
+ladder.
+"""
+import functools
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+N_BUCKETS = (64 - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+# Exported bucket bounds in seconds (Prometheus ``le`` labels)
+EXPORT_BOUNDS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_PORT = 9464
+
+
+def bucket_index(nanos):
+    shift = nanos.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return nanos
+    return shift * SUB_BUCKETS + (nanos >> shift)
+
+
+def bucket_bounds(index):
+    """[low, high) nanoseconds covered by a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.0
+        self._function = None
+
+    def set(self, value):
+        self.value = float(value)
+
+    def set_function(self, function):
+        """Read the value from ``function()`` at export time."""
+        self._function = function
+
+    def get(self):
+        return float(self._function()) if self._function is not None else self.value
+
+
+class _ShardOwner:
+    """Held only by one thread's ``threading.local``, so it is collected when that thread exits."""
+    __slots__ = ("__weakref__",)
+
+
+class Histogram:
+    """Log-linear latency histogram over nanoseconds.
+
+    Each recording thread writes its own shard of bucket counts, so the hot
+    path takes no lock; readers merge the shards. When a thread exits its
+    shard is folded into a retired total and released, so short-lived
+    threads (Streamlit runs every rerun on a new one) do not pile up shards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = {}                       # live shards by owner id
+        self._retired = [0] * (N_BUCKETS + 1)
+        self._lock = threading.Lock()
+
+    def _new_shard(self):
+        shard = [0] * (N_BUCKETS + 1)           # last slot: total nanos
+        owner = _ShardOwner()
+        with self._lock:
+            self._shards[id(owner)] = shard
+        weakref.finalize(owner, self._retire, id(owner))
+        self._local.owner, self._local.shard = owner, shard
+        return shard
+
+    def _retire(self, key):
+        with self._lock:
+            shard = self._shards.pop(key)
+            self._retired = [a + b for a, b in zip(self._retired, shard)]
+
+    def observe_ns(self, nanos):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shift = nanos.bit_length() - SUB_BUCKET_BITS - 1
+        shard[nanos if shift <= 0 else shift * SUB_BUCKETS + (nanos >> shift)] += 1
+        shard[-1] += nanos
+
+    def observe(self, seconds):
+        self.observe_ns(max(int(seconds * 1e9), 0))
+
+    def _merged(self):
+        with self._lock:
+            shards = [self._retired] + list(self._shards.values())
+        return [sum(column) for column in zip(*shards)]
+
+    @property
+    def counts(self):
+        return self._merged()[:-1]
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    @property
+    def total_nanos(self):
+        return self._merged()[-1]
+
+    def time(self):
+        return _Timer(self)
+
+    def quantile(self, q):
+        """Approximate ``q`` quantile in seconds (bucket midpoint), or None when empty."""
+        counts = self.counts
+        count = sum(counts)
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if n and seen > rank:
+                low, high = bucket_bounds(index)
+                return (low + high) / 2e9
+        return None
+
+    def cumulative(self, bounds):
+        """Counts at or below each bound (seconds), by bucket upper edge."""
+        counts = self.counts
+        out, seen, index = [], 0, 0
+        for bound in bounds:
+            limit = bound * 1e9
+            while index < N_BUCKETS and bucket_bounds(index)[1] <= limit:
+                seen += counts[index]
+                index += 1
+            out.append(seen)
+        return out
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe_ns(time.perf_counter_ns() - self.started)
+
+
+class Family:
+    """One metric name with a fixed set of label names and a child per label set."""
+
+    def __init__(self, kind, name, documentation, labelnames=()):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        self._factory = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}[kind]
+        if not self.labelnames:
+            self.labels()
+
+    def labels(self, *values, **labels):
+        key = values or tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self):
+        with self._lock:
+            return list(self._children.items())
+
+    # Label-less families act as their single child
+    def __getattr__(self, attr):
+        if attr.startswith("_") or self.labelnames:
+            raise AttributeError(attr)
+        return getattr(self.labels(), attr)
+
+
+def _label_text(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _family(self, kind, name, documentation, labelnames):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = Family(kind, name, documentation, labelnames)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} already registered as a {family.kind}")
+            return family
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._family("counter", name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._family("gauge", name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=()):
+        return self._family("histogram", name, documentation, labelnames)
+
+    def exposition(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            families = list(self._families.values())
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in family.children():
+                labels = _label_text(family.labelnames, values)
+                if family.kind == "counter":
+                    lines.append(f"{family.name}_total{labels} {child.value}")
+                elif family.kind == "gauge":
+                    lines.append(f"{family.name}{labels} {child.get()}")
+                else:
+                    for bound, seen in zip(EXPORT_BOUNDS, child.cumulative(EXPORT_BOUNDS)):
+                        lines.append(f"{family.name}_bucket{_label_text(family.labelnames, values, ('le', bound))} {seen}")
+                    lines.append(f"{family.name}_bucket{_label_text(family.labelnames, values, ('le', '+Inf'))} {child.count}")
+                    lines.append(f"{family.name}_sum{labels} {child.total_nanos / 1e9}")
+                    lines.append(f"{family.name}_count{labels} {child.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("smartgrid_stage_seconds", "Latency of instrumented pipeline stages.", ["stage"])
+ASSETS_SCORED = registry.counter("smartgrid_assets_scored", "Asset rows scored by the ensemble.")
+PAGE_RENDER_SECONDS = registry.histogram("smartgrid_page_render_seconds", "Streamlit page render time.", ["page"])
+RERUN_SECONDS = registry.histogram("smartgrid_rerun_seconds", "Full Streamlit script rerun time.")
+PAGE_SECTIONS = registry.gauge("smartgrid_page_html_sections", "Batched HTML sections sent by the last render of a page.", ["page"])
+SHADOW_DROPPED = registry.counter("smartgrid_shadow_dropped", "Batches skipped by shadow scoring because its queue was full.")
+SHADOW_ERRORS = registry.counter("smartgrid_shadow_errors", "Batches that failed in challenger shadow scoring.")
+REQUEST_SECONDS = registry.histogram("smartgrid_request_seconds", "Inference service request latency.", ["endpoint"])
+SERVICE_BATCHES = registry.counter("smartgrid_service_batches", "Micro-batches scored by the inference service.")
+
+
+def timed(stage):
+    """Decorator recording a function's latency under ``smartgrid_stage_seconds{stage=...}``."""
+    histogram = STAGE_SECONDS.labels(stage)
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe_ns(time.perf_counter_ns() - started)
+        return wrapper
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = registry
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def start_metrics_server(port=DEFAULT_PORT, host="127.0.0.1", registry=registry):
+    """Serve ``/metrics`` from a daemon thread; one server per port per process.
+
+    Returns the server, or None when the port is taken (e.g. by another worker).
+    """
+    with _servers_lock:
+        if port in _servers:
+            return _servers[port]
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        try:
+            server = ThreadingHTTPServer((host, port), handler)
+        except OSError:
+            _servers[port] = None
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name=f"metrics-{port}", daemon=True).start()
+        _servers[port] = server
+        return server
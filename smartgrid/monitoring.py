@@ -0,0 +1,119 @@
+"""Feature drift and sensor data-quality monitoring over streaming readings.
+
+Every sensor gets the same fixed bins in standardized units (plus an
+underflow and overflow bin), so a micro-batch is folded into the current
+histograms with a single ``bincount`` and no raw readings are kept. Current
+counts decay geometrically per batch, which makes them a sliding window
+with a configurable half-life. PSI and a binned Kolmogorov-Smirnov distance
+compare them against reference histograms built the same way.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from smartgrid.features import FEATURE_HIGH, FEATURE_LOW, FEATURE_MEAN, FEATURE_NAMES, FEATURE_STD, N_FEATURES
+
+N_BINS = 20
+BIN_RANGE = 5.0            # bins span +/- this many standard deviations
+PSI_STABLE = 0.1           # conventional "no significant shift" cut-off
+PSI_EPSILON = 1e-4
+
+
+@dataclass
+class DriftSummary:
+    psi: np.ndarray            # per feature
+    ks: np.ndarray             # per feature
+    null_rate: np.ndarray      # per feature
+    out_of_range_rate: np.ndarray
+    readings: float            # effective (decayed) readings in the current window
+
+    @property
+    def drift_score(self):
+        return float(self.psi.mean())
+
+    @property
+    def feature_stability(self):
+        """Share of features whose PSI is below PSI_STABLE."""
+        return float((self.psi < PSI_STABLE).mean())
+
+    @property
+    def data_quality(self):
+        return float(1 - (self.null_rate + self.out_of_range_rate).mean())
+
+    def drifted_features(self, k=5):
+        order = np.argsort(-self.psi)[:k]
+        return [(FEATURE_NAMES[f], float(self.psi[f]), float(self.ks[f])) for f in order]
+
+
+class DriftMonitor:
+    """Streaming per-feature histograms against a fixed reference window."""
+
+    def __init__(self, reference=None, n_bins=N_BINS, half_life=50):
+        self.n_bins = n_bins
+        self._slots = n_bins + 2
+        self._scale = np.float32(n_bins / (2 * BIN_RANGE))
+        self.decay = 0.5 ** (1 / half_life) if half_life else 1.0
+        self.reference = np.zeros((N_FEATURES, self._slots))
+        self.current = np.zeros((N_FEATURES, self._slots))
+        self.nulls = np.zeros(N_FEATURES)
+        self.out_of_range = np.zeros(N_FEATURES)
+        self.seen = np.zeros(N_FEATURES)      # readings including nulls
+        self.batches = 0
+        if reference is not None:
+            self.set_reference(reference)
+
+    def _bins(self, z):
+        bins = np.floor((z + np.float32(BIN_RANGE)) * self._scale) + 1
+        # fmax/fmin also send NaN to bin 0; callers mask missing readings out
+        return np.fmin(np.fmax(bins, 0), self._slots - 1).astype(np.intp)
+
+    def _matrix_counts(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        valid = ~np.isnan(matrix)
+        z = (matrix - FEATURE_MEAN.astype(np.float32)) / FEATURE_STD.astype(np.float32)
+        flat = (self._bins(z) + np.arange(N_FEATURES) * self._slots)[valid]
+        counts = np.bincount(flat, minlength=N_FEATURES * self._slots).reshape(N_FEATURES, self._slots)
+        return counts, valid
+
+    def set_reference(self, matrix):
+        """Reference histograms from an (n x N_FEATURES) matrix, e.g. the training set."""
+        self.reference = self._matrix_counts(matrix)[0].astype(np.float64)
+
+    def update(self, matrix):
+        """Fold an (n_assets x N_FEATURES) batch (NaN = missing reading) into the window."""
+        counts, valid = self._matrix_counts(matrix)
+        bad = (matrix < FEATURE_LOW) | (matrix > FEATURE_HIGH)
+        self._fold(counts, (~valid).sum(axis=0), bad.sum(axis=0), np.full(N_FEATURES, len(matrix)))
+
+    def update_records(self, records):
+        """Fold a batch of ingest ``TELEMETRY_DTYPE`` records into the window."""
+        features, values = records["feature"].astype(np.intp), records["value"]
+        valid = ~np.isnan(values)
+        f, v = features[valid], values[valid]
+        z = (v - FEATURE_MEAN.astype(np.float32)[f]) / FEATURE_STD.astype(np.float32)[f]
+        counts = np.bincount(f * self._slots + self._bins(z),
+                             minlength=N_FEATURES * self._slots).reshape(N_FEATURES, self._slots)
+        bad = (v < FEATURE_LOW[f]) | (v > FEATURE_HIGH[f])
+        self._fold(counts, np.bincount(features[~valid], minlength=N_FEATURES),
+                   np.bincount(f[bad], minlength=N_FEATURES), np.bincount(features, minlength=N_FEATURES))
+
+    def _fold(self, counts, nulls, out_of_range, seen):
+        for total in (self.current, self.nulls, self.out_of_range, self.seen):
+            total *= self.decay
+        self.current += counts
+        self.nulls += nulls
+        self.out_of_range += out_of_range
+        self.seen += seen
+        self.batches += 1
+
+    def summary(self):
+        ref = self.reference / np.maximum(self.reference.sum(axis=1, keepdims=True), 1)
+        cur = self.current / np.maximum(self.current.sum(axis=1, keepdims=True), 1e-12)
+        ref_s, cur_s = np.maximum(ref, PSI_EPSILON), np.maximum(cur, PSI_EPSILON)
+        psi = ((cur_s - ref_s) * np.log(cur_s / ref_s)).sum(axis=1)
+        ks = np.abs(np.cumsum(cur, axis=1) - np.cumsum(ref, axis=1)).max(axis=1)
+        seen = np.maximum(self.seen, 1e-12)
+        return DriftSummary(psi, ks, self.nulls / seen, self.out_of_range / seen, float(self.seen.sum()))
+
+    def memory_bytes(self):
+        return sum(array.nbytes for array in (self.reference, self.current, self.nulls, self.out_of_range, self.seen))
@@ -0,0 +1,193 @@
+"""Incrementally maintained risk ranking over a continuously rescored fleet."""
+import math
+from array import array
+
+import numpy as np
+
+from smartgrid.fleet import RISK_THRESHOLDS, RISK_TIERS, risk_tier_codes
+from smartgrid.metrics import timed
+
+_TIER_CUTOFFS = [RISK_THRESHOLDS[tier] for tier in RISK_TIERS[:-1]]
+MIN_BUCKETS = 1 << 10
+
+
+def _tier_code(score):
+    for code, cutoff in enumerate(_TIER_CUTOFFS):
+        if score > cutoff:
+            return code
+    return len(_TIER_CUTOFFS)
+
+
+def _int_array(values):
+    out = array("q")
+    out.frombytes(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+    return out
+
+
+class RiskIndex:
+    """Ranked index of failure probabilities with O(log n) score updates.
+
+    Scores in [0, 1] are quantized into ``n_buckets`` buckets (by default the
+    next power of two at or above the fleet size, so a bucket holds O(1)
+    assets on average and memory grows with the fleet). A Fenwick tree
+    holds per-bucket counts (for ranks and for stepping down through non-empty
+    buckets) and each bucket keeps an intrusive doubly linked list of its
+    assets, so moving an asset is O(1) list surgery plus two O(log B) tree
+    updates. Ranks and the top-K list are exact: ties inside a bucket are
+    broken by score and then by asset position. Non-finite scores rank as 0.
+    """
+
+    def __init__(self, scores, n_buckets=None):
+        scores = np.asarray(scores, dtype=np.float64)
+        scores = np.clip(np.where(np.isfinite(scores), scores, 0.0), 0.0, 1.0)
+        n = len(scores)
+        n_buckets = n_buckets or max(MIN_BUCKETS, 1 << max(n - 1, 0).bit_length())
+        self.n_buckets = n_buckets
+        buckets = self._buckets(scores)
+
+        # Fenwick tree built in O(B) from prefix sums: tree[i] = sum(counts(i - lowbit(i), i])
+        prefix = np.concatenate([[0], np.cumsum(np.bincount(buckets, minlength=n_buckets))])
+        idx = np.arange(1, n_buckets + 1)
+        self._tree = _int_array(np.concatenate([[0], prefix[idx] - prefix[idx - (idx & -idx)]]))
+
+        # Per-bucket linked lists, laid out in bucket order (all empty for an empty fleet)
+        nxt = np.full(n, -1, dtype=np.int64)
+        prv = np.full(n, -1, dtype=np.int64)
+        head = np.full(n_buckets, -1, dtype=np.int64)
+        if n:
+            order = np.argsort(buckets, kind="stable")
+            sorted_buckets = buckets[order]
+            same_as_next = np.append(sorted_buckets[1:] == sorted_buckets[:-1], False)
+            nxt[order[same_as_next]] = order[1:][same_as_next[:-1]]
+            prv[order[1:][same_as_next[:-1]]] = order[same_as_next]
+            firsts = np.flatnonzero(np.insert(~same_as_next[:-1], 0, True))
+            head[sorted_buckets[firsts]] = order[firsts]
+        self._head, self._next, self._prev = _int_array(head), _int_array(nxt), _int_array(prv)
+
+        self._scores = array("d", scores.tobytes())
+        self._bucket = _int_array(buckets)
+        tiers = risk_tier_codes(scores)
+        self._tier = array("b", tiers.tobytes())
+        self._tier_counts = np.bincount(tiers, minlength=len(RISK_TIERS)).tolist()
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def _buckets(self, scores):
+        return np.minimum((scores * self.n_buckets).astype(np.int64), self.n_buckets - 1)
+
+    # Fenwick tree primitives (bucket b lives at tree index b + 1)
+    def _tree_add(self, bucket, delta):
+        tree, i = self._tree, bucket + 1
+        while i <= self.n_buckets:
+            tree[i] += delta
+            i += i & -i
+
+    def _count_upto(self, bucket):
+        # Number of assets in buckets [0, bucket]
+        tree, i, total = self._tree, bucket + 1, 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _bucket_of_count(self, count):
+        # Lowest bucket b with _count_upto(b) >= count
+        tree, pos, step = self._tree, 0, 1 << (self.n_buckets.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self.n_buckets and tree[nxt] < count:
+                pos = nxt
+                count -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def _unlink(self, asset, bucket):
+        nxt, prv = self._next[asset], self._prev[asset]
+        if prv != -1:
+            self._next[prv] = nxt
+        else:
+            self._head[bucket] = nxt
+        if nxt != -1:
+            self._prev[nxt] = prv
+
+    def _link(self, asset, bucket):
+        first = self._head[bucket]
+        self._next[asset], self._prev[asset] = first, -1
+        if first != -1:
+            self._prev[first] = asset
+        self._head[bucket] = asset
+
+    def _members(self, bucket):
+        asset = self._head[bucket]
+        while asset != -1:
+            yield asset
+            asset = self._next[asset]
+
+    # Updates
+    def set_score(self, asset, score):
+        score = float(score)
+        score = min(max(score, 0.0), 1.0) if math.isfinite(score) else 0.0
+        old_bucket = self._bucket[asset]
+        new_bucket = min(int(score * self.n_buckets), self.n_buckets - 1)
+        if new_bucket != old_bucket:
+            self._unlink(asset, old_bucket)
+            self._link(asset, new_bucket)
+            self._tree_add(old_bucket, -1)
+            self._tree_add(new_bucket, 1)
+            self._bucket[asset] = new_bucket
+        tier = _tier_code(score)
+        if tier != self._tier[asset]:
+            self._tier_counts[self._tier[asset]] -= 1
+            self._tier_counts[tier] += 1
+            self._tier[asset] = tier
+        self._scores[asset] = score
+
+    def update(self, asset, delta):
+        self.set_score(asset, self._scores[asset] + delta)
+
+    @timed("ranking_update")
+    def apply_deltas(self, assets, deltas):
+        for asset, delta in zip(np.asarray(assets).tolist(), np.asarray(deltas).tolist()):
+            self.update(asset, delta)
+
+    # Queries
+    def score(self, asset):
+        return self._scores[asset]
+
+    def rank(self, asset):
+        """1-based position of the asset in the fleet-wide risk ranking."""
+        bucket, score = self._bucket[asset], self._scores[asset]
+        ahead = self._n - self._count_upto(bucket)
+        for other in self._members(bucket):
+            other_score = self._scores[other]
+            if other_score > score or (other_score == score and other < asset):
+                ahead += 1
+        return ahead + 1
+
+    @timed("ranking_top_k")
+    def top_k(self, k=20, tiers=None):
+        """Positions of the ``k`` highest-scoring assets, riskiest first."""
+        allowed = None if tiers is None else {RISK_TIERS.index(tier) for tier in tiers}
+        found = []
+        remaining = self._n
+        while len(found) < k and remaining > 0:
+            bucket = self._bucket_of_count(remaining)
+            members = list(self._members(bucket))
+            if allowed is not None:
+                # Tiers only get less urgent further down the ranking
+                if min(self._tier[asset] for asset in members) > max(allowed):
+                    break
+                members = [asset for asset in members if self._tier[asset] in allowed]
+            found.extend(members)
+            remaining = self._count_upto(bucket - 1) if bucket else 0
+        found.sort(key=lambda asset: (-self._scores[asset], asset))
+        return found[:k]
+
+    def tier_counts(self):
+        return dict(zip(RISK_TIERS, self._tier_counts))
+
+    def memory_bytes(self):
+        arrays = (self._tree, self._head, self._next, self._prev, self._scores, self._bucket, self._tier)
+        return sum(arr.itemsize * len(arr) for arr in arrays)
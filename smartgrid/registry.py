@@ -0,0 +1,416 @@
+"""File-backed model registry with champion/challenger serving and shadow scoring.
+
+A registered model is a directory ``<root>/vNNNNNN`` holding the pickled
+models of a ScoringEngine and a ``meta.json``; like fleet snapshots it is
+staged and renamed into place, and never changes afterwards. Which versions
+serve is recorded in a small ``ROLES`` file that is replaced atomically, so
+promoting a challenger is one ``os.replace``; role changes hold an flock on
+``ROLES.lock`` so concurrent writers never lose an update.
+
+``ModelServer`` answers requests with the champion only. Each scored batch
+is queued for a background thread that scores it again with every
+challenger and appends all predictions to a binary log; outcomes go to a
+second log and ``shadow_performance`` joins the two. The serving models are
+a single tuple swapped by reference, so a promotion neither drops nor
+stalls requests: calls in flight finish on the models they started with.
+"""
+import argparse
+import fcntl
+import json
+import os
+import pickle
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from smartgrid.fleet import RISK_THRESHOLDS
+from smartgrid.metrics import SHADOW_DROPPED, SHADOW_ERRORS, STAGE_SECONDS, timed
+from smartgrid.scoring import ScoringEngine, classification_metrics, fit_ensemble, synthesize_training_set
+
+FORMAT_VERSION = 1
+MODELS_FILE = "models.pkl"
+META_FILE = "meta.json"
+ROLES_FILE = "ROLES"
+ROLES_LOCK_FILE = "ROLES.lock"
+PREDICTIONS_LOG = "predictions.log"
+OUTCOMES_LOG = "outcomes.log"
+
+CHAMPION, CHALLENGER = 0, 1
+ROLE_NAMES = ("champion", "challenger")
+PREDICTION_DTYPE = np.dtype([("timestamp", "<f8"), ("asset", "<u4"), ("version", "<u4"),
+                             ("role", "u1"), ("probability", "<f4")])
+OUTCOME_DTYPE = np.dtype([("timestamp", "<f8"), ("asset", "<u4"), ("failed", "?")])
+
+SHADOW_QUEUE_SIZE = 64
+DECISION_THRESHOLD = RISK_THRESHOLDS["HIGH"]   # assets at HIGH or above get a work order
+HOLDOUT_SAMPLES = 20000
+HOLDOUT_SEED = 7
+REPLAY_BATCH_SIZE = 1024
+HOLDOUT_ASSET_BASE = np.uint32(1 << 31)        # keeps holdout ids clear of fleet asset ids
+NO_ASSET = np.uint32(0xFFFFFFFF)               # rows scored from a raw feature payload
+
+# Training recipes for ``bootstrap_registry`` and the ``train`` command
+DEFAULT_RECIPE = {"samples": 20000, "seed": 0, "rounds": 60, "learning_rate": 0.3, "bins": 32, "l2": 1.0}
+CHALLENGER_RECIPE = {"samples": 40000, "seed": 1, "rounds": 150, "learning_rate": 0.15, "bins": 64, "l2": 5.0}
+
+
+def _version_dir(version):
+    return f"v{version:06d}"
+
+
+def train_engine(samples, seed, rounds, learning_rate, bins, l2):
+    """Ensemble trained on a synthetic labeled history drawn with ``samples`` and ``seed``."""
+    return fit_ensemble(*synthesize_training_set(samples, seed), rounds, learning_rate, bins, l2)
+
+
+def read_log(path, dtype):
+    """All complete records of an append-only log (a torn last record is ignored)."""
+    try:
+        raw = np.fromfile(path, dtype=np.uint8)
+    except FileNotFoundError:
+        return np.empty(0, dtype=dtype)
+    return raw[:len(raw) - len(raw) % dtype.itemsize].view(dtype)
+
+
+class ModelRegistry:
+    """Versioned model artifacts under ``root`` plus the champion/challenger roles."""
+
+    def __init__(self, root):
+        self.root = root
+        self._log_lock = threading.Lock()
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name[1:]) for name in os.listdir(self.root) if name.startswith("v") and name[1:].isdigit())
+
+    def register(self, engine, metadata=None, role=None):
+        """Store ``engine``'s models as a new version; optionally promote it or add it as a challenger."""
+        os.makedirs(self.root, exist_ok=True)
+        version = max(self.versions(), default=0) + 1
+        meta = {
+            "format": FORMAT_VERSION,
+            "version": version,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "models": engine.model_names,
+            "weights": engine.weights.tolist(),
+            "metadata": metadata or {},
+        }
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.root)
+        try:
+            with open(os.path.join(staging, MODELS_FILE), "wb") as f:
+                pickle.dump({"models": engine.models, "weights": engine.weights}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(staging, META_FILE), "w") as f:
+                json.dump(meta, f, indent=2)
+            os.rename(staging, os.path.join(self.root, _version_dir(version)))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if role == "champion":
+            self.promote(version)
+        elif role == "challenger":
+            self.add_challenger(version)
+        return version
+
+    def metadata(self, version):
+        with open(os.path.join(self.root, _version_dir(version), META_FILE)) as f:
+            return json.load(f)
+
+    def load(self, version):
+        """A fresh ScoringEngine for ``version``. Artifacts are trusted local pickles."""
+        with open(os.path.join(self.root, _version_dir(version), MODELS_FILE), "rb") as f:
+            artifact = pickle.load(f)
+        return ScoringEngine(artifact["models"], artifact["weights"])
+
+    # Roles
+    def roles(self):
+        try:
+            with open(os.path.join(self.root, ROLES_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"champion": None, "challengers": []}
+
+    def _write_roles(self, roles):
+        pointer = os.path.join(self.root, f".{ROLES_FILE}.tmp")
+        with open(pointer, "w") as f:
+            json.dump(roles, f)
+        os.replace(pointer, os.path.join(self.root, ROLES_FILE))
+
+    @contextmanager
+    def _roles_locked(self):
+        # Role changes are read-modify-write; an flock serializes them across threads and processes
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ROLES_LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _check(self, version):
+        if version not in self.versions():
+            raise KeyError(f"No model version {version} under {self.root}")
+
+    def promote(self, version):
+        """Make ``version`` the champion; returns the previous champion (now retired)."""
+        self._check(version)
+        with self._roles_locked():
+            roles = self.roles()
+            previous = roles["champion"]
+            self._write_roles({"champion": version, "challengers": [v for v in roles["challengers"] if v != version]})
+        return previous
+
+    def add_challenger(self, version):
+        self._check(version)
+        with self._roles_locked():
+            roles = self.roles()
+            if version != roles["champion"] and version not in roles["challengers"]:
+                self._write_roles({"champion": roles["champion"], "challengers": roles["challengers"] + [version]})
+
+    def retire(self, version):
+        """Stop shadow-scoring a challenger."""
+        with self._roles_locked():
+            roles = self.roles()
+            self._write_roles({"champion": roles["champion"], "challengers": [v for v in roles["challengers"] if v != version]})
+
+    # Append-only logs
+    def _append(self, name, records):
+        with self._log_lock, open(os.path.join(self.root, name), "ab") as f:
+            records.tofile(f)
+
+    def log_predictions(self, records):
+        self._append(PREDICTIONS_LOG, records)
+
+    def log_outcomes(self, assets, failed, when=None):
+        records = np.empty(len(assets), dtype=OUTCOME_DTYPE)
+        records["timestamp"] = time.time() if when is None else when
+        records["asset"], records["failed"] = assets, failed
+        self._append(OUTCOMES_LOG, records)
+
+    def predictions(self):
+        return read_log(os.path.join(self.root, PREDICTIONS_LOG), PREDICTION_DTYPE)
+
+    def outcomes(self):
+        return read_log(os.path.join(self.root, OUTCOMES_LOG), OUTCOME_DTYPE)
+
+
+def bootstrap_registry(root):
+    """Open the registry, seeding an empty one with the default champion and one challenger."""
+    registry = ModelRegistry(root)
+    if registry.roles()["champion"] is None:
+        registry.register(train_engine(**DEFAULT_RECIPE), {"recipe": DEFAULT_RECIPE}, role="champion")
+        registry.register(train_engine(**CHALLENGER_RECIPE), {"recipe": CHALLENGER_RECIPE}, role="challenger")
+    return registry
+
+
+@dataclass(frozen=True)
+class _Serving:
+    champion_version: int
+    champion: ScoringEngine
+    challengers: tuple         # ((version, engine), ...)
+
+    @property
+    def versions(self):
+        return (self.champion_version,) + tuple(version for version, _ in self.challengers)
+
+
+class ModelServer:
+    """Champion scoring on the request path, challengers shadow-scored on a daemon thread.
+
+    Requests only pay for the champion and a non-blocking ``put`` on a
+    bounded queue; when the shadow thread falls behind, batches are dropped
+    from shadow scoring (and counted) rather than slowing requests down.
+    """
+
+    def __init__(self, registry, queue_size=SHADOW_QUEUE_SIZE):
+        self.registry = registry
+        self._serving = None
+        self._swap_lock = threading.Lock()
+        self._queue = queue.Queue(queue_size)
+        self.refresh()
+        threading.Thread(target=self._shadow_loop, name="shadow-scoring", daemon=True).start()
+
+    @property
+    def champion_version(self):
+        return self._serving.champion_version
+
+    @property
+    def champion(self):
+        return self._serving.champion
+
+    @property
+    def serving_versions(self):
+        return self._serving.versions
+
+    def serving_champion(self):
+        """``(version, engine)`` of the champion, read from one consistent serving set."""
+        serving = self._serving
+        return serving.champion_version, serving.champion
+
+    def refresh(self):
+        """Pick up role changes from the registry; returns True when the serving set was swapped.
+
+        New engines are loaded before the swap, and engines that keep serving are reused.
+        """
+        roles = self.registry.roles()
+        wanted = (roles["champion"],) + tuple(roles["challengers"])
+        if self._serving is not None and self._serving.versions == wanted:
+            return False
+        with self._swap_lock:
+            current = self._serving
+            if current is not None and current.versions == wanted:
+                return False
+            loaded = {} if current is None else dict(((current.champion_version, current.champion),) + current.challengers)
+            engines = [loaded.get(version) or self.registry.load(version) for version in wanted]
+            self._serving = _Serving(wanted[0], engines[0], tuple(zip(wanted[1:], engines[1:])))
+        return True
+
+    def promote(self, version):
+        """Promote ``version`` in the registry and swap it in for this process."""
+        previous = self.registry.promote(version)
+        self.refresh()
+        return previous
+
+    @timed("serve")
+    def score(self, features, assets=None, per_model=False):
+        """Champion probabilities for ``features`` (with ``per_model``, ``(per_model, ensemble)``).
+
+        Rows with asset ids are queued for shadow scoring; rows without one
+        (``assets`` None or NO_ASSET) could never be joined to an outcome and are skipped.
+        """
+        serving = self._serving
+        scores = serving.champion.predict_all(features)
+        if assets is not None:
+            try:
+                self._queue.put_nowait((serving, features, assets, scores[1], time.time()))
+            except queue.Full:
+                SHADOW_DROPPED.inc()
+        return scores if per_model else scores[1]
+
+    def flush(self):
+        """Block until every queued batch has been shadow-scored and logged."""
+        self._queue.join()
+
+    def _shadow_loop(self):
+        histogram = STAGE_SECONDS.labels("shadow_scoring")
+        while True:
+            serving, features, assets, probabilities, when = self._queue.get()
+            try:
+                known = np.asarray(assets) != NO_ASSET
+                if not known.all():
+                    features, assets, probabilities = features[known], assets[known], probabilities[known]
+                if not len(assets):
+                    continue
+                with histogram.time():
+                    batches = [(serving.champion_version, CHAMPION, probabilities)]
+                    batches += [(version, CHALLENGER, engine.predict(features)) for version, engine in serving.challengers]
+                    records = np.empty(len(assets) * len(batches), dtype=PREDICTION_DTYPE)
+                    for i, (version, role, scores) in enumerate(batches):
+                        block = records[i * len(assets):(i + 1) * len(assets)]
+                        block["timestamp"], block["asset"], block["version"] = when, assets, version
+                        block["role"], block["probability"] = role, scores
+                    self.registry.log_predictions(records)
+            except Exception:
+                SHADOW_ERRORS.inc()
+            finally:
+                self._queue.task_done()
+
+
+def _latest(keys):
+    """Index of the last record per distinct key (logs are in time order)."""
+    unique, first_from_end = np.unique(keys[::-1], return_index=True)
+    return unique, len(keys) - 1 - first_from_end
+
+
+def role_of(roles, version):
+    """``version``'s current role in a ``ModelRegistry.roles()`` mapping."""
+    if version == roles["champion"]:
+        return "champion"
+    return "challenger" if version in roles["challengers"] else "retired"
+
+
+def shadow_performance(registry, threshold=DECISION_THRESHOLD, versions=None):
+    """Classification metrics per logged model version against logged outcomes.
+
+    Each model's latest prediction for an asset is joined to the asset's
+    latest outcome; an asset counts as flagged at ``probability >= threshold``.
+    ``role`` is the version's role now, not the one it was logged under.
+    """
+    predictions, outcomes = registry.predictions(), registry.outcomes()
+    roles = registry.roles()
+    outcome_assets, last = _latest(outcomes["asset"])
+    failed = outcomes["failed"][last]
+    results = {}
+    for version in versions or np.unique(predictions["version"]).tolist():
+        own = predictions[predictions["version"] == version]
+        assets, last = _latest(own["asset"])
+        slot = np.minimum(np.searchsorted(outcome_assets, assets), max(len(outcome_assets) - 1, 0))
+        known = (outcome_assets[slot] == assets) if len(outcome_assets) else np.zeros(len(assets), dtype=bool)
+        if not known.any():
+            continue
+        last = last[known]
+        results[int(version)] = dict(role=role_of(roles, version),
+                                     **classification_metrics(failed[slot[known]], own["probability"][last], threshold))
+    return results
+
+
+def replay_holdout(server, n_samples=HOLDOUT_SAMPLES, seed=HOLDOUT_SEED, batch_size=REPLAY_BATCH_SIZE):
+    """Serve a labeled holdout set in batches and log its outcomes, so every serving model gets shadow metrics."""
+    features, labels = synthesize_training_set(n_samples, seed)
+    assets = HOLDOUT_ASSET_BASE + np.arange(n_samples, dtype=np.uint32)
+    for start in range(0, n_samples, batch_size):
+        server.score(features[start:start + batch_size], assets[start:start + batch_size])
+    server.flush()
+    server.registry.log_outcomes(assets, labels)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage registered failure-prediction models")
+    parser.add_argument("--root", default="models")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list versions and their roles")
+    train = sub.add_parser("train", help="train and register a new version")
+    for name, value in DEFAULT_RECIPE.items():
+        train.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    train.add_argument("--role", choices=["champion", "challenger"], default="challenger")
+    for command, text in (("promote", "make a version the champion"), ("challenge", "shadow-score a version"),
+                          ("retire", "stop shadow-scoring a challenger")):
+        sub.add_parser(command, help=text).add_argument("version", type=int)
+    evaluate = sub.add_parser("evaluate", help="replay a labeled holdout and print shadow metrics")
+    evaluate.add_argument("--samples", type=int, default=HOLDOUT_SAMPLES)
+    evaluate.add_argument("--threshold", type=float, default=DECISION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    registry = bootstrap_registry(args.root)
+    if args.command == "train":
+        recipe = {name: getattr(args, name) for name in DEFAULT_RECIPE}
+        started = time.perf_counter()
+        version = registry.register(train_engine(**recipe), {"recipe": recipe}, role=args.role)
+        print(f"Registered v{version} as {args.role} in {time.perf_counter() - started:.2f}s")
+    elif args.command == "promote":
+        previous = registry.promote(args.version)
+        print(f"v{args.version} is now champion (was v{previous})")
+    elif args.command == "challenge":
+        registry.add_challenger(args.version)
+    elif args.command == "retire":
+        registry.retire(args.version)
+    elif args.command == "evaluate":
+        server = ModelServer(registry)
+        replay_holdout(server, args.samples)
+        for version, metrics in shadow_performance(registry, args.threshold, server.serving_versions).items():
+            print(f"v{version} {metrics['role']:<10} precision {metrics['precision']:.3f}  recall {metrics['recall']:.3f}  "
+                  f"f1 {metrics['f1_score']:.3f}  accuracy {metrics['accuracy']:.3f}  ({metrics['assets']:,} assets)")
+    if args.command != "evaluate":
+        roles = registry.roles()
+        for version in registry.versions():
+            role = role_of(roles, version)
+            meta = registry.metadata(version)
+            print(f"v{version:<4} {role:<10} {meta['created']}  {' + '.join(meta['models'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Great-circle distance matrices and crew stop ordering."""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+AVERAGE_SPEED_MPH = 40.0
+ROAD_FACTOR = 1.3        # road miles per great-circle mile
+
+
+def haversine_matrix(lat1, lon1, lat2=None, lon2=None):
+    """Great-circle miles between every pair of points, in one broadcast."""
+    lat1, lon1 = np.radians(np.asarray(lat1, dtype=np.float64)), np.radians(np.asarray(lon1, dtype=np.float64))
+    if lat2 is None:
+        lat2, lon2 = lat1, lon1
+    else:
+        lat2, lon2 = np.radians(np.asarray(lat2, dtype=np.float64)), np.radians(np.asarray(lon2, dtype=np.float64))
+    a = (np.sin((lat1[:, None] - lat2[None, :]) / 2) ** 2
+         + np.cos(lat1)[:, None] * np.cos(lat2)[None, :] * np.sin((lon1[:, None] - lon2[None, :]) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def road_miles(lat1, lon1, lat2=None, lon2=None):
+    return haversine_matrix(lat1, lon1, lat2, lon2) * ROAD_FACTOR
+
+
+def travel_hours(miles):
+    return np.asarray(miles) / AVERAGE_SPEED_MPH
+
+
+class DistanceCache:
+    """LRU of road-mile matrices keyed by a digest of the coordinate set."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def matrix(self, lat, lon):
+        lat = np.ascontiguousarray(lat, dtype=np.float64)
+        lon = np.ascontiguousarray(lon, dtype=np.float64)
+        key = hashlib.blake2b(lat.tobytes() + lon.tobytes(), digest_size=16).digest()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        miles = road_miles(lat, lon)
+        miles.setflags(write=False)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = miles
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return miles
+
+
+distance_cache = DistanceCache()
+
+
+def tour_length(tour, dist):
+    """Length of a closed tour (returns to ``tour[0]``)."""
+    return float(dist[tour, np.roll(tour, -1)].sum())
+
+
+def nearest_neighbour_tour(dist, start=0):
+    n = len(dist)
+    tour = np.empty(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    current = start
+    for step in range(n):
+        tour[step] = current
+        visited[current] = True
+        if step == n - 1:
+            break
+        row = np.where(visited, np.inf, dist[current])
+        current = int(np.argmin(row))
+    return tour
+
+
+def two_opt(tour, dist, max_passes=50):
+    """Improve a closed tour with 2-opt segment reversals, keeping tour[0] fixed.
+
+    For each edge (a, b) the gains of exchanging it with every later edge
+    (c, d) are computed in one vectorized expression; the best exchange is
+    applied immediately.
+    """
+    tour = np.array(tour, dtype=np.intp)
+    n = len(tour)
+    if n < 4:
+        return tour
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 2):
+            a, b = tour[i], tour[i + 1]
+            c = tour[i + 2:]
+            d = np.roll(tour, -1)[i + 2:]
+            gain = dist[a, b] + dist[c, d] - dist[a, c] - dist[b, d]
+            if i == 0:
+                gain = gain[:-1]  # exchanging with the closing edge is a no-op
+            if not len(gain):
+                continue
+            best = int(np.argmax(gain))
+            if gain[best] > 1e-9:
+                j = i + 2 + best
+                tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return tour
+
+
+@dataclass
+class Route:
+    stops: np.ndarray            # indices into the stop list, in visiting order
+    miles: float
+    baseline_miles: float        # visiting the stops in the order given
+
+    @property
+    def hours(self):
+        return float(travel_hours(self.miles))
+
+    @property
+    def miles_saved(self):
+        return self.baseline_miles - self.miles
+
+    @property
+    def hours_saved(self):
+        return float(travel_hours(self.miles_saved))
+
+
+def plan_route(depot, stop_lat, stop_lon, cache=distance_cache):
+    """Order stops for a crew starting and ending at ``depot`` (lat, lon)."""
+    stop_lat, stop_lon = np.asarray(stop_lat), np.asarray(stop_lon)
+    if not len(stop_lat):
+        return Route(np.empty(0, dtype=np.intp), 0.0, 0.0)
+    lat = np.concatenate([[depot[0]], stop_lat])
+    lon = np.concatenate([[depot[1]], stop_lon])
+    dist = cache.matrix(lat, lon)
+    tour = two_opt(nearest_neighbour_tour(dist), dist)
+    baseline = tour_length(np.arange(len(lat)), dist)
+    return Route(tour[1:] - 1, tour_length(tour, dist), baseline)
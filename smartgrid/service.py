@@ -0,0 +1,538 @@
+"""Standalone asyncio inference service that micro-batches concurrent scoring requests.
+
+    python -m smartgrid.service serve --port 8080
+    python -m smartgrid.service loadtest --url http://127.0.0.1:8080 --concurrency 64
+
+Endpoints (JSON over HTTP/1.1 keep-alive):
+
+    POST /score          {"asset_id": "AST-0042"} or {"features": [...]}
+    POST /score/batch    {"asset_ids": [...]} or {"features": [[...], ...]}
+    GET  /health
+    GET  /metrics        Prometheus exposition
+
+Requests never call the model themselves: they append their feature rows
+to a ``MicroBatcher`` and are answered from a callback on its future. The batcher flushes when
+``max_batch`` rows are waiting or the oldest has lingered ``linger``
+seconds, scores the whole batch with one vectorized champion call (which
+also queues it for challenger shadow scoring) and hands each request its
+slice. Asset IDs resolve to rows of the current fleet snapshot; the
+snapshot and the registry's champion are re-checked every
+``refresh_seconds`` so promotions and new snapshots are picked up without a
+restart.
+"""
+import argparse
+import asyncio
+import collections
+import http.client
+import json
+import os
+import queue
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from smartgrid.catalog import BUSINESS_IMPACT
+from smartgrid.features import N_FEATURES
+from smartgrid.fleet import RISK_TIERS, risk_tier_codes
+from smartgrid.index import AssetIndex
+from smartgrid.metrics import REQUEST_SECONDS, SERVICE_BATCHES, registry
+from smartgrid.registry import NO_ASSET, ModelServer, bootstrap_registry
+from smartgrid.snapshot import build_snapshot, current_version, open_snapshot
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BATCH = 512
+LINGER = 0.001
+MAX_REQUEST_ROWS = 10_000
+MAX_BODY_BYTES = 8 << 20
+MAX_HEADER_BYTES = 64 << 10
+REFRESH_SECONDS = 5.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ScoringError(Exception):
+    """A request the service rejected (``status`` 4xx/5xx) or could not reach (``status`` None)."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}" if status else message)
+        self.status = status
+        self.message = message
+
+
+# Micro-batching
+class MicroBatcher:
+    """Coalesces concurrent requests' feature rows into one ``score`` call per batch.
+
+    ``score(features, assets)`` must return ``(version, columns)`` with one
+    column of outputs per row; it runs on the event loop, so a batch costs one
+    vectorized call rather than one call (and one thread hop) per request.
+    ``linger=0`` flushes on the loop's next pass, batching whatever arrived
+    in the same pass.
+    """
+
+    def __init__(self, score, max_batch=MAX_BATCH, linger=LINGER):
+        self.score = score
+        self.max_batch = max_batch
+        self.linger = linger
+        self._pending = []
+        self._rows = 0
+        self._timer = None
+
+    def submit(self, features, assets):
+        """Future resolving to ``(version, columns)`` for this request's rows."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((features, assets, future))
+        self._rows += len(features)
+        if self._rows >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.linger, self.flush) if self.linger else loop.call_soon(self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._rows = self._pending, [], 0
+        if not pending:
+            return
+        features = np.concatenate([item[0] for item in pending]) if len(pending) > 1 else pending[0][0]
+        assets = np.concatenate([item[1] for item in pending]) if len(pending) > 1 else pending[0][1]
+        try:
+            version, columns = self.score(features, assets)
+        except Exception as exc:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        SERVICE_BATCHES.inc()
+        start = 0
+        for rows, _, future in pending:
+            stop = start + len(rows)
+            if not future.done():       # the client may have gone away
+                future.set_result((version, columns[:, start:stop]))
+            start = stop
+
+
+# Service
+class _BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class InferenceService:
+    """Scores fleet assets (by ID) or raw feature rows with the registry's champion."""
+
+    def __init__(self, snapshot_root, model_root, max_batch=MAX_BATCH, linger=LINGER,
+                 refresh_seconds=REFRESH_SECONDS):
+        self.snapshot_root = snapshot_root
+        self.models = ModelServer(bootstrap_registry(model_root))
+        self.refresh_seconds = refresh_seconds
+        self.batcher = MicroBatcher(self._score, max_batch, linger)
+        self.snapshot_version = None
+        self._load_snapshot()
+        self._routes = {"/score": ("POST", self._score_one), "/score/batch": ("POST", self._score_batch),
+                        "/health": ("GET", self._health), "/metrics": ("GET", None)}
+
+    def _load_snapshot(self):
+        version = current_version(self.snapshot_root)
+        if version is None:
+            build_snapshot(self.snapshot_root, BUSINESS_IMPACT["total_assets_monitored"])
+            version = current_version(self.snapshot_root)
+        if version == self.snapshot_version:
+            return False
+        snapshot = open_snapshot(self.snapshot_root, version)
+        fleet = snapshot.to_frame()
+        # Swapped as one tuple so a request never pairs one snapshot's index with another's features
+        # (a plain ndarray view of the memmap: memmap's own __getitem__ costs more than the lookup)
+        self._fleet = (AssetIndex(fleet), np.asarray(snapshot.features, dtype=np.float32),
+                       fleet["asset_num"].to_numpy().astype(np.uint32))
+        self.snapshot_version = version
+        return True
+
+    def refresh(self):
+        """Pick up a newly published snapshot or promoted champion."""
+        return self._load_snapshot() | self.models.refresh()
+
+    def _score(self, features, assets):
+        # The version is read next to the call, not after the await, so a swap in between cannot mislabel it
+        version = self.models.champion_version
+        per_model, ensemble = self.models.score(features, assets, per_model=True)
+        # Tiers for the whole batch at once; per request they would cost more than the scoring
+        return version, np.vstack([per_model, ensemble, risk_tier_codes(ensemble)])
+
+    # Request payloads to (features, assets)
+    def _lookup(self, ids):
+        index, features, nums = self._fleet
+        if any(isinstance(asset_id, bool) or not isinstance(asset_id, (str, int)) for asset_id in ids):
+            raise _BadRequest(400, "asset IDs must be strings or integers")
+        positions = [index.position(asset_id) for asset_id in ids]
+        missing = [asset_id for asset_id, position in zip(ids, positions) if position is None]
+        if missing:
+            raise _BadRequest(404, f"Unknown asset IDs: {', '.join(map(str, missing[:10]))}")
+        positions = np.asarray(positions, dtype=np.intp)
+        return features[positions], nums[positions]
+
+    @staticmethod
+    def _features(rows):
+        try:
+            features = np.array(rows, dtype=np.float32, ndmin=2)
+        except (TypeError, ValueError):
+            raise _BadRequest(400, "features must be numbers") from None
+        if features.ndim != 2 or features.shape[1] != N_FEATURES:
+            raise _BadRequest(400, f"features must have {N_FEATURES} values per asset")
+        if not np.isfinite(features).all():
+            raise _BadRequest(400, "features must be finite")
+        return features, np.full(len(features), NO_ASSET, dtype=np.uint32)
+
+    def _results(self, columns, ids):
+        names = self.models.champion.model_names
+        return [{"asset_id": asset_id, "failure_probability": row[-2], "risk_level": RISK_TIERS[int(row[-1])],
+                 "scores": dict(zip(names, row))}
+                for asset_id, row in zip(ids, columns.T.tolist())]
+
+    # Scoring handlers return a result, or ``(future, finish)`` to complete once the batch is scored
+    def _score_one(self, payload):
+        if "asset_id" in payload:
+            ids = [payload["asset_id"]]
+            features, assets = self._lookup(ids)
+        elif "features" in payload:
+            ids = [None]
+            features, assets = self._features([payload["features"]])
+            if len(features) != 1:
+                raise _BadRequest(400, "/score takes one asset; use /score/batch")
+        else:
+            raise _BadRequest(400, "expected asset_id or features")
+        return self.batcher.submit(features, assets), \
+            lambda version, columns: dict(self._results(columns, ids)[0], model_version=version)
+
+    def _score_batch(self, payload):
+        if "asset_ids" in payload and isinstance(payload["asset_ids"], list):
+            ids = payload["asset_ids"]
+            features, assets = self._lookup(ids) if ids else (np.empty((0, N_FEATURES), np.float32),
+                                                             np.empty(0, np.uint32))
+        elif "features" in payload:
+            features, assets = self._features(payload["features"]) if payload["features"] else \
+                (np.empty((0, N_FEATURES), np.float32), np.empty(0, np.uint32))
+            ids = [None] * len(features)
+        else:
+            raise _BadRequest(400, "expected asset_ids or features")
+        if len(features) > MAX_REQUEST_ROWS:
+            raise _BadRequest(413, f"at most {MAX_REQUEST_ROWS:,} assets per request")
+        if not len(features):
+            return {"model_version": self.models.champion_version, "results": []}
+        return self.batcher.submit(features, assets), \
+            lambda version, columns: {"model_version": version, "results": self._results(columns, ids)}
+
+    def _health(self, payload):
+        return {"status": "ok", "model_version": self.models.champion_version,
+                "snapshot_version": self.snapshot_version, "assets": len(self._fleet[0])}
+
+    def handle(self, method, path, body, respond):
+        """Route one request; ``respond(status, content_type, body)`` is called now or once it is scored."""
+        route = self._routes.get(path.split("?", 1)[0])
+        try:
+            if route is None:
+                raise _BadRequest(404, f"No route for {path}")
+            if method != route[0]:
+                raise _BadRequest(405, f"{path} takes {route[0]}")
+            if route[1] is None:
+                respond(200, "text/plain; version=0.0.4; charset=utf-8", registry.exposition().encode())
+                return
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                raise _BadRequest(400, "body is not valid JSON") from None
+            if not isinstance(payload, dict):
+                raise _BadRequest(400, "body must be a JSON object")
+            result = route[1](payload)
+        except _BadRequest as exc:
+            respond(exc.status, "application/json", json.dumps({"error": str(exc)}).encode())
+            return
+        if isinstance(result, dict):
+            respond(200, "application/json", json.dumps(result).encode())
+            return
+        future, finish = result
+
+        def done(future):
+            try:
+                respond(200, "application/json", json.dumps(finish(*future.result())).encode())
+            except Exception as exc:
+                respond(500, "application/json", json.dumps({"error": repr(exc)}).encode())
+        future.add_done_callback(done)
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                # Loading a promoted model or a new snapshot happens off the event loop
+                await loop.run_in_executor(None, self.refresh)
+            except Exception:
+                pass
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: _HTTPConnection(self), host, port, backlog=1024)
+        refresher = asyncio.ensure_future(self._refresh_loop())
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+
+class _HTTPConnection(asyncio.Protocol):
+    """HTTP/1.1 keep-alive connection, parsed in ``data_received`` with no coroutine per request.
+
+    Responses are written in request order even when pipelined requests
+    land in different batches.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.transport = None
+        self._buffer = b""
+        self._waiting = collections.deque()     # [response bytes or None, keep_alive] per request
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def data_received(self, data):
+        buffer = self._buffer + data if self._buffer else data
+        while True:
+            end = buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(buffer) > MAX_HEADER_BYTES:
+                    self.transport.close()
+                    return
+                break
+            request_line, *lines = buffer[:end].decode("latin-1").split("\r\n")
+            headers = {}
+            for line in lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                method, path, version = request_line.split(" ", 2)
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                self.transport.close()
+                return
+            if length > MAX_BODY_BYTES:
+                self._request(413, path, False)
+                return
+            if len(buffer) < end + 4 + length:
+                break
+            body, buffer = buffer[end + 4:end + 4 + length], buffer[end + 4 + length:]
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            self._request(None, path, keep_alive, method, body)
+            if not keep_alive:
+                buffer = b""
+                break
+        self._buffer = buffer
+
+    def _request(self, status, path, keep_alive, method=None, body=None):
+        slot = [None, keep_alive]
+        self._waiting.append(slot)
+        started = time.perf_counter_ns()
+
+        def respond(status, content_type, body):
+            close = "" if keep_alive else "Connection: close\r\n"
+            slot[0] = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                       f"Content-Length: {len(body)}\r\n{close}\r\n").encode() + body
+            REQUEST_SECONDS.labels(path.split("?", 1)[0] if status != 404 else "unknown").observe_ns(
+                time.perf_counter_ns() - started)
+            self._write_ready()
+
+        if status is not None:
+            respond(status, "application/json", json.dumps({"error": REASONS[status]}).encode())
+            return
+        try:
+            self.service.handle(method, path, body, respond)
+        except Exception as exc:
+            respond(500, "application/json", json.dumps({"error": repr(exc)}).encode())
+
+    def _write_ready(self):
+        while self._waiting and self._waiting[0][0] is not None:
+            response, keep_alive = self._waiting.popleft()
+            if self.transport is None:
+                continue
+            self.transport.write(response)
+            if not keep_alive:
+                self.transport.close()
+
+
+# Client
+class ScoringClient:
+    """Blocking client with a pool of keep-alive connections, safe to share across threads.
+
+    A request that fails on a pooled connection (e.g. the server closed it)
+    is retried once on a fresh one; service errors raise ``ScoringError``.
+    """
+
+    def __init__(self, url, pool_size=8, timeout=2.0):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(pool_size)
+
+    def _connection(self):
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            connection, reused = self._connection()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise ScoringError(None, f"{self.host}:{self.port} unreachable: {exc}") from exc
+            self._release(connection)
+            result = json.loads(data) if data else {}
+            if response.status != 200:
+                raise ScoringError(response.status, result.get("error", response.reason))
+            return result
+
+    def score(self, asset_id=None, features=None):
+        payload = {"asset_id": asset_id} if asset_id is not None else {"features": list(map(float, features))}
+        return self.request("POST", "/score", payload)
+
+    def score_batch(self, asset_ids=None, features=None):
+        payload = {"asset_ids": list(asset_ids)} if asset_ids is not None else \
+            {"features": np.asarray(features, dtype=np.float64).tolist()}
+        return self.request("POST", "/score/batch", payload)
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# Load generator
+async def _load_connection(host, port, payloads, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        index = 0
+        while time.perf_counter() < deadline:
+            request = payloads[index % len(payloads)]
+            index += 1
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ", 1)[1].split(b"\r\n", 1)[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0])
+    finally:
+        writer.close()
+
+
+def _request_bytes(host, port, path, payload):
+    body = json.dumps(payload).encode()
+    return (f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def load_test(url, concurrency=64, duration=10.0, batch_size=1, seed=0, warmup=1.0):
+    """Closed-loop load from ``concurrency`` keep-alive connections; returns a summary dict."""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    n_assets = ScoringClient(url).health()["assets"]
+    rng = np.random.default_rng(seed)
+    nums = rng.integers(1, n_assets + 1, (1024, batch_size))
+    if batch_size == 1:
+        payloads = [_request_bytes(host, port, "/score", {"asset_id": f"AST-{int(row[0]):04d}"}) for row in nums]
+    else:
+        payloads = [_request_bytes(host, port, "/score/batch", {"asset_ids": [f"AST-{int(n):04d}" for n in row]})
+                    for row in nums]
+    if warmup:
+        await asyncio.gather(*(_load_connection(host, port, payloads, time.perf_counter() + warmup, [], [])
+                               for _ in range(concurrency)))
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(_load_connection(host, port, payloads[i::concurrency] or payloads,
+                                            started + duration, latencies, errors)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies = np.sort(np.asarray(latencies)) * 1000
+    return {"requests": len(latencies), "errors": len(errors), "seconds": elapsed,
+            "requests_per_second": len(latencies) / elapsed,
+            "scores_per_second": (len(latencies) - len(errors)) * batch_size / elapsed,
+            "p50_ms": float(np.percentile(latencies, 50)), "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(latencies[-1])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching inference service and its load generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    serve_parser = commands.add_parser("serve", help="run the service")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--snapshots", default=os.environ.get("SMARTGRID_SNAPSHOT_DIR",
+                                                                    os.path.join(here, "snapshots")))
+    serve_parser.add_argument("--models", default=os.environ.get("SMARTGRID_MODEL_DIR", os.path.join(here, "models")))
+    serve_parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    serve_parser.add_argument("--linger-ms", type=float, default=LINGER * 1000, help="longest a request waits for a batch")
+    load_parser = commands.add_parser("loadtest", help="drive a running service and report latency and throughput")
+    load_parser.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    load_parser.add_argument("--concurrency", type=int, default=64)
+    load_parser.add_argument("--duration", type=float, default=10.0)
+    load_parser.add_argument("--batch-size", type=int, default=1, help="assets per request (1: /score)")
+    load_parser.add_argument("--p99-ms", type=float, default=10.0, help="target; exit non-zero when missed")
+    load_parser.add_argument("--min-rate", type=float, default=20_000, help="target scores/s; exit non-zero when missed")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        service = InferenceService(args.snapshots, args.models, args.max_batch, args.linger_ms / 1000)
+        print(f"Serving {len(service._fleet[0]):,} assets (snapshot {service.snapshot_version}) with champion "
+              f"{service.models.champion_version} on http://{args.host}:{args.port}", flush=True)
+        try:
+            asyncio.run(service.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    summary = asyncio.run(load_test(args.url, args.concurrency, args.duration, args.batch_size))
+    print(f"{summary['requests']:,} requests in {summary['seconds']:.1f}s ({summary['errors']} errors): "
+          f"{summary['requests_per_second']:,.0f} req/s, {summary['scores_per_second']:,.0f} scores/s")
+    print(f"latency p50 {summary['p50_ms']:.2f} ms  p99 {summary['p99_ms']:.2f} ms  max {summary['max_ms']:.2f} ms")
+    met = summary["p99_ms"] <= args.p99_ms and summary["scores_per_second"] >= args.min_rate and not summary["errors"]
+    print(f"targets (p99 <= {args.p99_ms:g} ms, >= {args.min_rate:,.0f} scores/s): {'met' if met else 'MISSED'}")
+    return 0 if met else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
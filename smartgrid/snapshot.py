@@ -0,0 +1,196 @@
+"""Versioned, memory-mapped on-disk fleet snapshots.
+
+A snapshot is a directory holding one ``.npy`` file per fleet column (plus an
+optional sensor feature matrix) and a small ``header.json`` with the schema
+and the string dictionaries of the categorical columns. Snapshots are
+written once, published atomically by renaming into ``<root>/vNNNNNN`` and
+flipping the ``CURRENT`` pointer, and opened read-only with ``mmap_mode="r"``
+so every session in every process shares the same page-cache copy.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from smartgrid.features import synthesize_features
+from smartgrid.fleet import FLEET_SCHEMA_VERSION, apply_scores, generate_fleet
+from smartgrid.metrics import timed
+from smartgrid.scoring import train_default_engine
+
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+CURRENT_FILE = "CURRENT"
+FEATURES_FILE = "features.npy"
+
+
+def _version_dir(version):
+    return f"v{version:06d}"
+
+
+def list_versions(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(name[1:]) for name in os.listdir(root) if name.startswith("v") and name[1:].isdigit())
+
+
+def write_snapshot(root, fleet, features=None, version=None, metadata=None):
+    """Write ``fleet`` (and optionally its feature matrix) as a new snapshot version."""
+    os.makedirs(root, exist_ok=True)
+    if version is None:
+        version = max(list_versions(root), default=0) + 1
+    header = {
+        "format": FORMAT_VERSION,
+        "schema": FLEET_SCHEMA_VERSION,
+        "version": version,
+        "n_assets": len(fleet),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "columns": {},
+        "metadata": metadata or {},
+    }
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    try:
+        for name, column in fleet.items():
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                values = column.cat.codes.to_numpy()
+                spec = {"kind": "categorical", "categories": [str(c) for c in column.cat.categories],
+                        "ordered": bool(column.cat.ordered)}
+            else:
+                values = column.to_numpy()
+                spec = {"kind": "datetime" if values.dtype.kind == "M" else "numeric"}
+            spec["dtype"] = values.dtype.str
+            np.save(os.path.join(staging, f"{name}.npy"), values)
+            header["columns"][name] = spec
+        if features is not None:
+            np.save(os.path.join(staging, FEATURES_FILE), np.ascontiguousarray(features))
+            header["features"] = {"shape": list(features.shape), "dtype": np.asarray(features).dtype.str}
+        with open(os.path.join(staging, HEADER_FILE), "w") as f:
+            json.dump(header, f, indent=2)
+        final = os.path.join(root, _version_dir(version))
+        os.rename(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _publish(root, version)
+    return final
+
+
+def _publish(root, version):
+    pointer = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(pointer, "w") as f:
+        f.write(_version_dir(version))
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+
+def current_version(root):
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return int(f.read().strip()[1:])
+    except FileNotFoundError:
+        return None
+
+
+def prune_snapshots(root, keep=3):
+    """Remove all but the newest ``keep`` versions (never the current one)."""
+    current = current_version(root)
+    for version in list_versions(root)[:-keep]:
+        if version != current:
+            shutil.rmtree(os.path.join(root, _version_dir(version)), ignore_errors=True)
+
+
+class Snapshot:
+    """Read-only view over one snapshot directory; columns are memmaps."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            self.header = json.load(f)
+        if self.header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {self.header['format']} in {path}")
+        self.version = self.header["version"]
+        self.schema = self.header.get("schema", 1)
+        self.n_assets = self.header["n_assets"]
+        self.columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                        for name in self.header["columns"]}
+        self.features = None
+        if "features" in self.header:
+            self.features = np.load(os.path.join(path, FEATURES_FILE), mmap_mode="r")
+
+    def __len__(self):
+        return self.n_assets
+
+    def column(self, name):
+        """Decoded column; categoricals become pandas Categoricals."""
+        spec = self.header["columns"][name]
+        values = self.columns[name]
+        if spec["kind"] == "categorical":
+            return pd.Categorical.from_codes(values, categories=spec["categories"],
+                                             ordered=spec["ordered"], validate=False)
+        return values
+
+    def to_frame(self, positions=None):
+        """Fleet DataFrame; without ``positions`` numeric columns stay memory-mapped.
+
+        Categorical code arrays (one byte per asset) are the only columns pandas copies.
+        """
+        if positions is None:
+            return pd.DataFrame({name: self.column(name) for name in self.columns}, copy=False)
+        data = {}
+        for name, spec in self.header["columns"].items():
+            values = self.columns[name][positions]
+            if spec["kind"] == "categorical":
+                values = pd.Categorical.from_codes(values, categories=spec["categories"], ordered=spec["ordered"])
+            data[name] = values
+        return pd.DataFrame(data, index=np.asarray(positions))
+
+
+@timed("open_snapshot")
+def open_snapshot(root, version=None):
+    """Open a snapshot directory, or a version (default ``CURRENT``) under ``root``."""
+    if os.path.exists(os.path.join(root, HEADER_FILE)):
+        return Snapshot(root)
+    version = current_version(root) if version is None else version
+    if version is None:
+        raise FileNotFoundError(f"No published snapshot under {root}")
+    return Snapshot(os.path.join(root, _version_dir(version)))
+
+
+@timed("build_snapshot")
+def build_snapshot(root, n_assets, seed=None):
+    """Generate, score and publish a fleet snapshot with the default engine."""
+    fleet = generate_fleet(n_assets, seed=seed)
+    features = synthesize_features(fleet["failure_probability"], seed=None if seed is None else seed + 1)
+    engine = train_default_engine()
+    apply_scores(fleet, engine.predict(features))
+    return write_snapshot(root, fleet, features, metadata={"seed": seed, "models": engine.model_names})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and inspect fleet snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="generate, score and publish a new snapshot")
+    build.add_argument("--root", default="snapshots")
+    build.add_argument("--assets", type=int, default=9247)
+    build.add_argument("--seed", type=int, default=None)
+    build.add_argument("--keep", type=int, default=3)
+    info = sub.add_parser("info", help="print the current snapshot header")
+    info.add_argument("--root", default="snapshots")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        path = build_snapshot(args.root, args.assets, args.seed)
+        prune_snapshots(args.root, keep=args.keep)
+        print(f"Published {path} ({args.assets:,} assets) in {time.perf_counter() - started:.2f}s")
+    else:
+        snapshot = open_snapshot(args.root)
+        print(json.dumps({key: value for key, value in snapshot.header.items() if key != "columns"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
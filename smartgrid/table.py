@@ -0,0 +1,81 @@
+"""Server-side sorting and paging of the asset priority table."""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from smartgrid.fleet import asset_ids
+
+SORT_COLUMNS = {
+    "Failure Probability": "failure_probability",
+    "Days to Failure": "days_to_failure",
+    "Criticality": "criticality_score",
+    "Replacement Cost": "replacement_cost",
+    "Maintenance Cost": "maintenance_cost",
+    "Last Maintenance": "last_maintenance",
+    "Asset ID": "asset_num",
+}
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+DISPLAY_COLUMNS = ["asset_id", "asset_type", "location", "voltage_level", "risk_level", "failure_probability",
+                   "days_to_failure", "criticality_score", "maintenance_cost", "replacement_cost", "last_maintenance"]
+
+
+@dataclass
+class Page:
+    positions: np.ndarray      # fleet rows on this page, in display order
+    total: int                 # rows matching the filters
+    page: int
+    page_size: int
+
+    @property
+    def n_pages(self):
+        return max(1, -(-self.total // self.page_size))
+
+    @property
+    def first_row(self):
+        return self.page * self.page_size + 1 if self.total else 0
+
+    @property
+    def last_row(self):
+        return self.page * self.page_size + len(self.positions)
+
+
+def _sort_keys(fleet, column, positions):
+    values = fleet[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        keys = values.cat.codes.to_numpy()
+    else:
+        keys = values.to_numpy()
+        if keys.dtype.kind == "M":
+            keys = keys.view(np.int64)
+    return keys[positions]
+
+
+def query_page(fleet, candidates=None, sort_by="failure_probability", descending=True, page=0, page_size=50):
+    """One page of ``candidates`` (default: every row); only rows up to this page are fully sorted."""
+    candidates = np.arange(len(fleet)) if candidates is None else np.asarray(candidates)
+    total = len(candidates)
+    n_pages = max(1, -(-total // page_size))
+    page = min(max(page, 0), n_pages - 1)
+    end = min((page + 1) * page_size, total)
+    if not end:
+        return Page(np.empty(0, dtype=np.intp), total, page, page_size)
+    keys = _sort_keys(fleet, sort_by, candidates).astype(np.float64)
+    if descending:
+        keys = -keys
+    if end < total:
+        # Everything tied with the last needed key, so ties page deterministically
+        head = np.flatnonzero(keys <= np.partition(keys, end - 1)[end - 1])
+    else:
+        head = np.arange(total)
+    head = head[np.lexsort((candidates[head], keys[head]))]
+    return Page(candidates[head[page * page_size:end]], total, page, page_size)
+
+
+def page_frame(fleet, positions):
+    """Display frame for the rows of one page."""
+    rows = fleet.iloc[positions]
+    frame = rows.assign(asset_id=asset_ids(rows["asset_num"]))[DISPLAY_COLUMNS]
+    return frame.reset_index(drop=True)
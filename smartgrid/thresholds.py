@@ -0,0 +1,180 @@
+"""Cost-aware selection of risk-tier thresholds from the precision/recall/cost curve.
+
+Flagging an asset costs its planned maintenance; an unflagged asset that
+fails costs its replacement. For every candidate threshold ``t`` (flag when
+``score >= t``) the curve holds the flagged count, failures caught,
+precision, recall and total cost. Scores are sorted once, ascending, by
+packing each float32 score's bits and its row into one uint64 key (a plain
+``sort`` is several times faster than ``argsort``); every curve column is
+then a cumulative sum over that order read off at the first row of each
+distinct score.
+
+Outcomes may be observed failures (0/1) or, for assets without one yet, the
+failure probability itself, which makes the curve an expectation. New
+labeled outcomes are sorted on their own and merged into the sorted
+columns, and only the cumulative sums after the first merged row are
+recomputed.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from smartgrid.fleet import RISK_TIERS
+from smartgrid.metrics import timed
+
+MIN_RECALL = 0.5               # HIGH: cheapest threshold that still catches this share of failures
+WATCH_RECALL = 0.9             # MEDIUM: fewest assets that together hold this share
+CRITICAL_PRECISION = 0.2       # CRITICAL: most assets at or above HIGH where this share fails
+
+_LOW_BITS = np.uint64(0xFFFFFFFF)
+_ROW = np.dtype((np.void, 16))   # one (score, outcome, replacement, maintenance) float32 row
+
+
+def sort_order(scores):
+    """Ascending order of non-negative float32 ``scores`` (ties by position)."""
+    scores = np.ascontiguousarray(scores, dtype=np.float32)
+    if len(scores) >= 1 << 32:
+        return np.argsort(scores, kind="stable")
+    key = scores.view(np.uint32).astype(np.uint64) << np.uint64(32)
+    key |= np.arange(len(scores), dtype=np.uint64)
+    key.sort()
+    return (key & _LOW_BITS).astype(np.intp)
+
+
+def _stack(scores, outcomes, replacement_cost, maintenance_cost):
+    rows = np.empty((len(scores), 4), dtype=np.float32)
+    for column, values in enumerate((scores, outcomes, replacement_cost, maintenance_cost)):
+        rows[:, column] = values
+    return rows
+
+
+@dataclass
+class ThresholdCurve:
+    """One row per distinct score, thresholds descending; row 0 flags nothing."""
+    thresholds: np.ndarray     # flag when score >= threshold
+    flagged: np.ndarray
+    caught: np.ndarray         # (expected) failures among the flagged
+    precision: np.ndarray
+    recall: np.ndarray
+    cost: np.ndarray           # maintenance of flagged + replacement of missed failures
+    failures: float
+    seconds: float
+
+    def __len__(self):
+        return len(self.thresholds)
+
+    def at(self, threshold):
+        """Row of the curve that flags ``score >= threshold``."""
+        return int(np.searchsorted(-self.thresholds, -threshold, side="right")) - 1
+
+    def cheapest(self, min_recall=0.0):
+        """Row with the lowest cost among those reaching ``min_recall``."""
+        feasible = np.flatnonzero(self.recall >= min_recall - 1e-12)
+        return int(feasible[np.argmin(self.cost[feasible])])
+
+    def row(self, index):
+        return {"threshold": float(self.thresholds[index]), "flagged": int(self.flagged[index]),
+                "caught": float(self.caught[index]), "precision": float(self.precision[index]),
+                "recall": float(self.recall[index]), "cost": float(self.cost[index])}
+
+
+class ThresholdOptimizer:
+    """Scores, outcomes and costs kept in ascending score order, with their cumulative sums.
+
+    The four columns share one (n, 4) float32 block, so sorting and merging
+    move whole rows with a single ``take`` or ``insert``.
+    """
+
+    def __init__(self, scores, outcomes, replacement_cost, maintenance_cost):
+        self._rows = np.take(_stack(scores, outcomes, replacement_cost, maintenance_cost), sort_order(scores), axis=0)
+        self._sums = None
+        self._curve = None
+
+    scores = property(lambda self: self._rows[:, 0])
+    outcomes = property(lambda self: self._rows[:, 1])
+    replacement = property(lambda self: self._rows[:, 2])
+    maintenance = property(lambda self: self._rows[:, 3])
+
+    @classmethod
+    def from_fleet(cls, fleet, outcomes=None):
+        """Optimizer over a scored fleet; without ``outcomes`` each asset's probability is its expected outcome."""
+        scores = fleet["failure_probability"].to_numpy()
+        return cls(scores, scores if outcomes is None else outcomes,
+                   fleet["replacement_cost"].to_numpy(), fleet["maintenance_cost"].to_numpy())
+
+    def __len__(self):
+        return len(self.scores)
+
+    def _cumulate(self, start=0):
+        # Prefix sums with a leading zero: sums[:, i] covers rows [0, i)
+        if self._sums is None or start == 0:
+            self._sums = np.zeros((3, len(self._rows) + 1))
+            start = 0
+        rows = self._rows[start:]
+        for sums, values in zip(self._sums, (rows[:, 1], rows[:, 1] * rows[:, 2], rows[:, 3])):
+            np.cumsum(values, dtype=np.float64, out=sums[start + 1:])
+            if start:
+                sums[start + 1:] += sums[start]
+
+    @timed("threshold_update")
+    def add(self, scores, outcomes, replacement_cost, maintenance_cost):
+        """Merge newly labeled predictions; cumulative sums are redone only from the first merged row."""
+        rows = np.take(_stack(scores, outcomes, replacement_cost, maintenance_cost), sort_order(scores), axis=0)
+        positions = np.searchsorted(self.scores, rows[:, 0], side="right")
+        first = int(positions[0]) if len(positions) else len(self._rows)
+        # 1-D inserts of whole 16-byte rows are several times faster than an axis-0 insert
+        merged = np.insert(self._rows.view(_ROW).ravel(), positions, rows.view(_ROW).ravel())
+        self._rows = merged.view(np.float32).reshape(-1, 4)
+        if self._sums is not None:
+            prefix = self._sums[:, :first + 1]
+            self._sums = np.empty((3, len(self._rows) + 1))
+            self._sums[:, :first + 1] = prefix
+            self._cumulate(first)
+        self._curve = None
+
+    @timed("threshold_curve")
+    def curve(self):
+        if self._curve is not None:
+            return self._curve
+        started = time.perf_counter()
+        if self._sums is None:
+            self._cumulate()
+        n = len(self.scores)
+        # Candidate cuts, ascending: the first row of each distinct score, then n ("flag nothing");
+        # the curve keeps reversed views so thresholds run from high to low
+        cuts = np.flatnonzero(np.concatenate([[True], self.scores[1:] != self.scores[:-1], [True]])) if n else np.zeros(1, np.intp)
+        failures_sum, failure_cost_sum, maintenance_sum = self._sums
+        caught = failures_sum[n] - failures_sum[cuts]
+        flagged = n - cuts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = caught / flagged
+        precision[-1] = 1.0
+        recall = caught / failures_sum[n] if failures_sum[n] > 0 else np.ones(len(cuts))
+        cost = maintenance_sum[n] - maintenance_sum[cuts]
+        cost += failure_cost_sum[cuts]
+        thresholds = np.append(self.scores[cuts[:-1]], np.inf)
+        self._curve = ThresholdCurve(thresholds[::-1], flagged[::-1], caught[::-1], precision[::-1], recall[::-1],
+                                     cost[::-1], float(failures_sum[n]), time.perf_counter() - started)
+        return self._curve
+
+    def tiers(self, min_recall=MIN_RECALL, watch_recall=WATCH_RECALL, critical_precision=CRITICAL_PRECISION):
+        """``(cutoffs, rows)``: tier cut-offs in the ``fleet.RISK_THRESHOLDS`` convention (a
+        probability above a cut-off is in that tier) and each tier's curve row.
+
+        HIGH is the cheapest threshold that reaches ``min_recall``; CRITICAL
+        the lowest threshold at or above HIGH whose precision reaches
+        ``critical_precision`` (no CRITICAL tier if none does); MEDIUM the
+        highest threshold at or below HIGH that reaches ``watch_recall``.
+        """
+        curve = self.curve()
+        high = curve.cheapest(min_recall)
+        precise = np.flatnonzero(curve.precision[1:high + 1] >= critical_precision) + 1
+        critical = int(precise[-1]) if len(precise) else 0
+        watch = np.flatnonzero(curve.recall[high:] >= watch_recall - 1e-12)
+        medium = high + int(watch[0]) if len(watch) else len(curve) - 1
+        rows = dict(zip(RISK_TIERS, (critical, high, medium)))
+        # score >= t  <=>  score > nextafter(t, 0); row 0 (flag nothing) maps to 1.0
+        return ({tier: float(np.nextafter(np.float32(curve.thresholds[row]), np.float32(0))) if row else 1.0
+                 for tier, row in rows.items()},
+                {tier: curve.row(row) for tier, row in rows.items()})
@@ -0,0 +1,252 @@
+"""Rolling-origin cross-validation of the scoring ensemble on timestamped failure history.
+
+Fold ``k`` trains on the ``window_weeks`` before its origin and tests on the
+``horizon_weeks`` after it; origins advance one horizon at a time and the
+last fold ends with the history, so every test week is scored by a model
+that saw nothing from that week or later. History is sorted by time, so a
+fold is just two row ranges. The feature matrix and labels are copied once
+into shared memory and pool workers attach to them by name (as in
+``smartgrid.batch``); only row bounds and fold results are pickled.
+
+Outcomes carry a seasonal swing that the sensors do not show (weather-driven
+stress), so a model fitted on one season is miscalibrated for the next and
+the spread across folds shows it.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from smartgrid.features import N_FEATURES, synthesize_features
+from smartgrid.fleet import RISK_LOGIT_MEAN, RISK_LOGIT_STD, RISK_THRESHOLDS
+from smartgrid.registry import DECISION_THRESHOLD, DEFAULT_RECIPE, bootstrap_registry
+from smartgrid.scoring import classification_metrics, fit_ensemble
+
+HISTORY_ROWS = 1_000_000
+HISTORY_WEEKS = 104
+HISTORY_START = "2023-01-05"     # numpy weeks start on Thursdays
+N_FOLDS = 52
+WINDOW_WEEKS = 13
+HORIZON_WEEKS = 1
+SEASONAL_AMPLITUDE = 0.5         # outcome log-odds swing over the year
+SEASONAL_PEAK_WEEK = 30          # late July
+RECALL_THRESHOLDS = tuple(sorted(RISK_THRESHOLDS.values()))
+FIT_PARAMETERS = ("rounds", "learning_rate", "bins", "l2")
+REPORT_FILE = "validation.json"
+
+WEEK = np.timedelta64(7 * 86400, "s")
+WEEKS_PER_YEAR = 365.25 / 7
+
+
+def synthesize_history(n_rows=HISTORY_ROWS, n_weeks=HISTORY_WEEKS, seed=0, start=HISTORY_START):
+    """Time-sorted ``(timestamps, features, labels)`` of sensor snapshots and subsequent failures."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(start, "s")
+    offsets = np.sort(rng.integers(0, n_weeks * 7 * 86400, n_rows))
+    timestamps = start + offsets.astype("timedelta64[s]")
+    logits = rng.normal(RISK_LOGIT_MEAN, RISK_LOGIT_STD, n_rows)
+    features = synthesize_features(1 / (1 + np.exp(-logits)), seed=seed + 1)
+    week_of_year = offsets / (7 * 86400) % WEEKS_PER_YEAR
+    season = SEASONAL_AMPLITUDE * np.cos(2 * np.pi * (week_of_year - SEASONAL_PEAK_WEEK) / WEEKS_PER_YEAR)
+    labels = rng.random(n_rows) < 1 / (1 + np.exp(-(logits + season)))
+    return timestamps, features, labels
+
+
+@dataclass
+class Fold:
+    index: int
+    origin: np.datetime64
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+
+def rolling_folds(timestamps, n_folds=N_FOLDS, window_weeks=WINDOW_WEEKS, horizon_weeks=HORIZON_WEEKS):
+    """Row ranges for rolling-origin folds over sorted ``timestamps``; ``window_weeks=None`` expands."""
+    timestamps = np.asarray(timestamps, dtype="datetime64[s]")
+    end = (timestamps[-1].astype("datetime64[W]") + 1).astype("datetime64[s]")
+    origins = end - (n_folds - np.arange(n_folds)) * horizon_weeks * WEEK
+    if window_weeks is not None and origins[0] - window_weeks * WEEK < timestamps[0]:
+        raise ValueError(f"{n_folds} folds with a {window_weeks}-week window need more than "
+                         f"{(end - timestamps[0]) / WEEK:.0f} weeks of history")
+    folds = []
+    for index, origin in enumerate(origins):
+        train_from = timestamps[0] if window_weeks is None else origin - window_weeks * WEEK
+        bounds = np.searchsorted(timestamps, [train_from, origin, origin + horizon_weeks * WEEK])
+        folds.append(Fold(index, origin, int(bounds[0]), int(bounds[1]), int(bounds[1]), int(bounds[2])))
+    return folds
+
+
+@dataclass
+class FoldResult:
+    index: int
+    origin: str
+    n_train: int
+    n_test: int
+    failures: int
+    precision: float
+    recall: float
+    f1_score: float
+    accuracy: float
+    recall_at: dict            # threshold -> recall
+    seconds: float
+    worker: int
+
+
+METRICS = ("precision", "recall", "f1_score", "accuracy")
+
+
+@dataclass
+class ValidationReport:
+    folds: list
+    n_rows: int
+    window_weeks: int
+    horizon_weeks: int
+    threshold: float
+    recipe: dict
+    workers: int
+    wall_seconds: float
+    metadata: dict = field(default_factory=dict)
+
+    def summary(self):
+        """``{metric: (mean, std)}`` across folds, including ``recall@<threshold>``."""
+        columns = {name: [getattr(fold, name) for fold in self.folds] for name in METRICS}
+        for threshold in RECALL_THRESHOLDS:
+            columns[f"recall@{threshold:g}"] = [fold.recall_at[str(threshold)] for fold in self.folds]
+        return {name: (float(np.mean(values)), float(np.std(values))) for name, values in columns.items()}
+
+    @property
+    def busy_seconds(self):
+        return sum(fold.seconds for fold in self.folds)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["folds"] = [FoldResult(**fold) for fold in data["folds"]]
+        return cls(**data)
+
+
+# Worker side: attached blocks live for the lifetime of the pool process
+_worker = {}
+
+
+def _attach(features_name, labels_name, n_rows, recipe, threshold):
+    features_block = shared_memory.SharedMemory(name=features_name)
+    labels_block = shared_memory.SharedMemory(name=labels_name)
+    _worker["blocks"] = (features_block, labels_block)
+    _worker["features"] = np.ndarray((n_rows, N_FEATURES), dtype=np.float32, buffer=features_block.buf)
+    _worker["labels"] = np.ndarray(n_rows, dtype=bool, buffer=labels_block.buf)
+    _worker["recipe"], _worker["threshold"] = recipe, threshold
+
+
+def _run_fold(fold):
+    started = time.perf_counter()
+    features, labels = _worker["features"], _worker["labels"]
+    train, test = slice(fold.train_start, fold.train_stop), slice(fold.test_start, fold.test_stop)
+    engine = fit_ensemble(features[train], labels[train], **_worker["recipe"])
+    probability = engine.predict(features[test])
+    actual = labels[test]
+    metrics = classification_metrics(actual, probability, _worker["threshold"])
+    recall_at = {str(t): classification_metrics(actual, probability, t)["recall"] for t in RECALL_THRESHOLDS}
+    return FoldResult(fold.index, str(fold.origin.astype("datetime64[D]")), fold.train_stop - fold.train_start,
+                      fold.test_stop - fold.test_start, metrics["failures"],
+                      *(metrics[name] for name in METRICS), recall_at, time.perf_counter() - started, os.getpid())
+
+
+def cross_validate(timestamps, features, labels, n_folds=N_FOLDS, window_weeks=WINDOW_WEEKS,
+                   horizon_weeks=HORIZON_WEEKS, recipe=None, threshold=DECISION_THRESHOLD, workers=None):
+    """Train and score the ensemble on every rolling-origin fold; ``workers=1`` runs in-process."""
+    started = time.perf_counter()
+    recipe = {name: (recipe or DEFAULT_RECIPE)[name] for name in FIT_PARAMETERS}
+    folds = rolling_folds(timestamps, n_folds, window_weeks, horizon_weeks)
+    workers = min(workers or os.cpu_count() or 1, len(folds))
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    labels = np.ascontiguousarray(labels, dtype=bool)
+    if workers == 1:
+        _worker.update(features=features, labels=labels, recipe=recipe, threshold=threshold)
+        results = [_run_fold(fold) for fold in folds]
+        _worker.clear()
+    else:
+        features_block = shared_memory.SharedMemory(create=True, size=max(features.nbytes, 1))
+        labels_block = shared_memory.SharedMemory(create=True, size=max(labels.nbytes, 1))
+        try:
+            np.ndarray(features.shape, dtype=np.float32, buffer=features_block.buf)[:] = features
+            np.ndarray(labels.shape, dtype=bool, buffer=labels_block.buf)[:] = labels
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(features_block.name, labels_block.name, len(labels), recipe,
+                                               threshold)) as pool:
+                results = list(pool.map(_run_fold, folds))
+        finally:
+            for block in (features_block, labels_block):
+                block.close()
+                block.unlink()
+    return ValidationReport(results, len(labels), window_weeks, horizon_weeks, threshold, recipe, workers,
+                            time.perf_counter() - started)
+
+
+def save_report(report, path):
+    pointer = f"{path}.tmp"
+    with open(pointer, "w") as f:
+        json.dump(report.to_dict(), f, indent=2)
+    os.replace(pointer, path)
+
+
+def load_report(path):
+    try:
+        with open(path) as f:
+            return ValidationReport.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin cross-validation of the scoring ensemble")
+    parser.add_argument("--rows", type=int, default=HISTORY_ROWS)
+    parser.add_argument("--weeks", type=int, default=HISTORY_WEEKS)
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--window", type=int, default=WINDOW_WEEKS, help="training weeks per fold (0: expanding)")
+    parser.add_argument("--horizon", type=int, default=HORIZON_WEEKS)
+    parser.add_argument("--threshold", type=float, default=DECISION_THRESHOLD)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--root", default=None, help="model registry; validates the champion's recipe and "
+                                                     f"writes {REPORT_FILE} there for the dashboard")
+    args = parser.parse_args(argv)
+
+    recipe, metadata = DEFAULT_RECIPE, {"seed": args.seed}
+    if args.root:
+        registry = bootstrap_registry(args.root)
+        champion = registry.roles()["champion"]
+        recipe = registry.metadata(champion)["metadata"].get("recipe", DEFAULT_RECIPE)
+        metadata["model_version"] = champion
+
+    generated = time.perf_counter()
+    timestamps, features, labels = synthesize_history(args.rows, args.weeks, args.seed)
+    print(f"History: {args.rows:,} rows over {args.weeks} weeks, {labels.mean():.2%} failures "
+          f"({time.perf_counter() - generated:.1f}s)")
+    report = cross_validate(timestamps, features, labels, args.folds, args.window or None, args.horizon,
+                            recipe, args.threshold, args.workers)
+    report.metadata.update(metadata)
+    for fold in report.folds:
+        print(f"fold {fold.index:3d}  {fold.origin}  train {fold.n_train:>9,}  test {fold.n_test:>7,}  "
+              f"failures {fold.failures:>5,}  P {fold.precision:.3f}  R {fold.recall:.3f}  F1 {fold.f1_score:.3f}  "
+              f"{fold.seconds:6.2f}s")
+    for name, (mean, std) in report.summary().items():
+        print(f"{name:<14} {mean:.3f} ± {std:.3f}")
+    print(f"{len(report.folds)} folds in {report.wall_seconds:.1f}s on {report.workers} workers "
+          f"({report.busy_seconds / (report.wall_seconds * report.workers):.0%} parallel efficiency)")
+    if args.root:
+        save_report(report, os.path.join(args.root, REPORT_FILE))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Dashboard pages, each imported on first visit.
+
+Streamlit reruns app.py on every interaction; keeping each page in its own
+module means a rerun only executes (and, the first time, imports) the page
+that is selected. Page data is built on first visit and kept in the shared
+cache, keyed by the fleet version. The package is deliberately not called
+``pages`` so Streamlit does not treat it as a multipage app.
+"""
+import importlib
+import os
+import sys
+
+from smartgrid.cache import shared_cache
+from smartgrid.metrics import PAGE_SECTIONS
+from smartgrid.registry import OUTCOMES_LOG, shadow_performance
+from views import html
+
+SHADOW_METRICS_TTL = 300
+
+PAGES = {
+    "📊 Predictive Dashboard": "dashboard",
+    "🤖 ML Model Performance": "model_performance",
+    "👥 Crew Optimization": "crew_optimization",
+    "🏗️ AKS Architecture": "architecture",
+    "💰 Business Impact Analysis": "business_impact",
+}
+
+
+def render(page, shared):
+    html.start_page()
+    importlib.import_module(f"{__name__}.{PAGES[page]}").render(shared)
+    PAGE_SECTIONS.labels(page).set(html.sections_sent())
+
+
+def champion_shadow(server):
+    """The champion's shadow-log metrics, or None until it has logged predictions with outcomes.
+
+    The ML Model Performance page replays a labeled holdout to fill the logs.
+    """
+    champion_version = server.champion_version
+    outcomes = os.path.join(server.registry.root, OUTCOMES_LOG)
+    logged = os.path.getsize(outcomes) if os.path.exists(outcomes) else 0
+    return shared_cache.get_or_create(
+        "champion_shadow", lambda: shadow_performance(server.registry, versions=[champion_version]).get(champion_version),
+        version=(champion_version, logged), ttl=SHADOW_METRICS_TTL)
+
+
+def loaded():
+    """Labels of the pages imported so far in this process."""
+    return [page for page, module in PAGES.items() if f"{__name__}.{module}" in sys.modules]
@@ -0,0 +1,96 @@
+"""AKS Architecture: cluster layout, Airflow DAGs and infrastructure cost."""
+import streamlit as st
+
+from views.html import Template, fragment, section
+
+TRAINING_COMPONENTS = [
+    {"name": "XGBoost Training Pods", "replicas": "3", "cpu": "4 cores", "memory": "16GB"},
+    {"name": "TensorFlow GPU Pods", "replicas": "2", "cpu": "8 cores + GPU", "memory": "32GB"},
+    {"name": "Feature Engineering", "replicas": "5", "cpu": "2 cores", "memory": "8GB"},
+    {"name": "Data Validation", "replicas": "2", "cpu": "2 cores", "memory": "4GB"}
+]
+
+PRODUCTION_COMPONENTS = [
+    {"name": "Inference API Gateway", "replicas": "4", "cpu": "2 cores", "memory": "4GB"},
+    {"name": "Model Serving (MLflow)", "replicas": "3", "cpu": "4 cores", "memory": "8GB"},
+    {"name": "Airflow Workers", "replicas": "6", "cpu": "2 cores", "memory": "6GB"},
+    {"name": "Grafana + Prometheus", "replicas": "2", "cpu": "2 cores", "memory": "8GB"}
+]
+
+ARCHITECTURE_NODE = Template("""
+    <div class="architecture-node">
+    <h5>{name}</h5>
+    <p>Replicas: {replicas} | CPU: {cpu} | RAM: {memory}</p>
+    </div>
+""")
+
+
+def render(shared):
+    st.markdown("### 🏗️ Azure Kubernetes Service Architecture")
+
+    # Architecture diagram
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%); 
+                border: 2px solid #ff6b35; border-radius: 15px; padding: 2rem; text-align: center; margin: 2rem 0;">
+    <h4 style="color: #ff6b35;">ML Pipeline Data Flow on AKS</h4>
+    <div style="font-size: 1.1em; line-height: 2; margin-top: 1rem;">
+    <strong>SCADA Data</strong> → <strong>Kafka Ingestion</strong> → <strong>Feature Store</strong> → 
+    <strong>ML Training Pods</strong> → <strong>Model Registry</strong> → <strong>Inference Service</strong> → 
+    <strong>Grafana Dashboard</strong>
+    </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Kubernetes components
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 🎯 ML Training Infrastructure")
+
+        section(fragment(ARCHITECTURE_NODE, TRAINING_COMPONENTS))
+
+    with col2:
+        st.markdown("#### ⚙️ Production Infrastructure")
+
+        section(fragment(ARCHITECTURE_NODE, PRODUCTION_COMPONENTS))
+
+    # Airflow DAG workflow
+    st.markdown("#### 🔄 Apache Airflow DAG Architecture")
+
+    st.markdown(f"""
+    <div class="model-performance">
+    <h4>Automated ML Pipeline DAGs</h4>
+    <p><strong>daily_model_retrain.py:</strong> Scheduled daily at 2 AM, pulls 24h data, retrains ensemble models</p>
+    <p><strong>feature_engineering.py:</strong> Runs every 4 hours, calculates rolling statistics and anomaly scores</p>
+    <p><strong>model_validation.py:</strong> Weekly validation against hold-out test set, drift detection</p>
+    <p><strong>prediction_batch.py:</strong> Hourly batch predictions for all {len(shared["fleet"]):,} assets (<code>python -m smartgrid.batch</code>: chunked multi-core scoring, published as a new snapshot version)</p>
+    <p><strong>alert_generation.py:</strong> Real-time alert processing when failure probability > threshold (per-tier hysteresis, 24h per-asset suppression, ranked by expected cost)</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # System performance metrics
+    st.markdown("#### 📊 AKS Cluster Performance")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Pod Uptime", "99.7%", "+0.2%")
+    with col2:
+        st.metric("CPU Utilization", "67%", "+5%")
+    with col3:
+        st.metric("Memory Usage", "73%", "+3%")
+    with col4:
+        st.metric("Storage IOPS", "12.5K", "+1.2K")
+
+    # Cost optimization
+    st.markdown("#### 💰 AKS Cost Optimization")
+
+    st.markdown("""
+    <div class="cost-savings">
+    <h4>Kubernetes Cost Optimization Results</h4>
+    <p><strong>Auto-scaling:</strong> Cluster scales from 12-45 nodes based on ML training demand</p>
+    <p><strong>Spot Instances:</strong> 70% of training workload runs on Azure Spot VMs (-80% cost)</p>
+    <p><strong>Resource Rightsizing:</strong> ML model optimization reduced memory usage by 40%</p>
+    <p><strong>Monthly Infrastructure Cost:</strong> $23,400 (vs $67,000 on-premise equivalent)</p>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,214 @@
+"""Predictive Dashboard: risk tiers, priority assets, fleet table and per-asset analysis."""
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from smartgrid.cache import shared_cache
+from smartgrid.features import FEATURE_MEAN, FEATURE_NAMES
+from smartgrid.fleet import asset_ids, asset_records
+from smartgrid.index import INDEXED_COLUMNS
+from smartgrid.service import ScoringError
+from smartgrid.table import PAGE_SIZES, SORT_COLUMNS, page_frame, query_page
+from views.html import METRIC_CARD, Template, fragment, section
+
+EXPLAIN_TOP_K = 500
+
+TIER_CARDS = {
+    "CRITICAL": {"label": "Critical Risk", "color": "#ff4757", "note": "Immediate action required"},
+    "HIGH": {"label": "High Risk", "color": "#ffa502", "note": "Schedule within 30 days"},
+    "MEDIUM": {"label": "Medium Risk", "color": "#2ed573", "note": "Routine monitoring"},
+    "LOW": {"label": "Low Risk", "color": "#70a1ff", "note": "Normal operation"},
+}
+
+# Section templates
+PREDICTION_CARD = Template("""
+    <div class="prediction-card risk-{risk_class}">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <div>
+            <h4>{asset_id} - {asset_type}</h4>
+            <p><strong>Location:</strong> {location} | <strong>Voltage:</strong> {voltage_level}</p>
+            <p><strong>Failure Probability:</strong> {failure_probability:.1%} | <strong>Est. Days to Failure:</strong> {days_to_failure}</p>
+        </div>
+        <div style="text-align: right;">
+            <h3 style="color: #ff6b35;">{risk_level}</h3>
+            <p><strong>Maintenance Cost:</strong> ${maintenance_cost:,}</p>
+            <p><strong>Replacement Cost:</strong> ${replacement_cost:,}</p>
+        </div>
+    </div>
+    </div>
+""")
+
+PREDICTION_RESULT = Template("""
+    <div class="model-performance">
+    <h4>🧠 ML Model Prediction Results for {asset[asset_id]}</h4>
+    <p><strong>Asset Type:</strong> {asset[asset_type]} at {asset[location]}</p>
+    {model_rows}
+    <p><strong>Ensemble Average:</strong> {ensemble:.1%} (scored in {latency_ms:.1f} ms, {scored_by})</p>
+    </div>
+""")
+
+MODEL_ROW = Template("<p><strong>{name}:</strong> {probability:.2%} failure probability</p>")
+
+RISK_FACTOR = Template("""
+    <div class="feature-importance">
+    <strong>{feature}:</strong> {direction} failure probability by {points:.2f} pts
+    (reading {reading:.2f} vs fleet mean {mean:.2f})
+    </div>
+""")
+
+DRIVER_ROW = Template("<p><strong>{feature}:</strong> {points:+.2f} pts on average</p>")
+
+
+def render(shared):
+    assets_data, scoring_engine, risk_index = shared["fleet"], shared["engine"], shared["risk_index"]
+    asset_index = shared["asset_index"]
+    tier_counts = risk_index.tier_counts()
+
+    st.markdown("### 🎯 Real-Time Asset Risk Assessment")
+
+    # Key metrics row
+    section('<div class="metric-row">',
+            fragment(METRIC_CARD, [dict(card, value=f"{tier_counts[tier]:,}") for tier, card in TIER_CARDS.items()]),
+            "</div>")
+
+    # Asset predictions table
+    st.markdown("### 🔮 Top Priority Asset Predictions")
+
+    # Top 20 highest risk assets
+    high_risk_assets = shared_cache.get_or_create(
+        "priority_assets",
+        lambda: asset_records(assets_data, risk_index.top_k(20, tiers=["CRITICAL", "HIGH"])),
+        version=shared["version"]
+    )
+
+    view_mode = st.radio("View:", ["Priority Cards (Top 20)", "Fleet Table"], horizontal=True, key="fleet_view")
+
+    if view_mode == "Fleet Table":
+        # Filtering, sorting and paging run server-side; only one page is sent
+        filter_cols = st.columns(4)
+        filters = {}
+        for col, name, label in zip(filter_cols, INDEXED_COLUMNS, ["Asset Type", "Voltage", "Location", "Risk Tier"]):
+            with col:
+                filters[name] = st.multiselect(label, asset_index.categories[name], key=f"table_{name}")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            sort_label = st.selectbox("Sort by:", list(SORT_COLUMNS), key="table_sort")
+        with col2:
+            descending = st.toggle("Descending", value=True, key="table_descending")
+        with col3:
+            page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1, key="table_page_size")
+
+        started = time.perf_counter()
+        candidates = asset_index.filter(filters)
+        n_pages = max(1, -(-len(candidates) // page_size))
+        with col4:
+            page_number = st.number_input(f"Page (of {n_pages:,}):", min_value=1, max_value=n_pages,
+                                          value=1, key="table_page")
+
+        table_page = query_page(assets_data, candidates, SORT_COLUMNS[sort_label], descending,
+                                int(page_number) - 1, page_size)
+        st.dataframe(
+            page_frame(assets_data, table_page.positions),
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "asset_id": st.column_config.TextColumn("Asset ID"),
+                "asset_type": "Type",
+                "location": "Location",
+                "voltage_level": "Voltage",
+                "risk_level": "Risk",
+                "failure_probability": st.column_config.ProgressColumn(
+                    "Failure Probability", format="%.3f", min_value=0.0, max_value=1.0),
+                "days_to_failure": st.column_config.NumberColumn("Days to Failure"),
+                "criticality_score": st.column_config.NumberColumn("Criticality", format="%.2f"),
+                "maintenance_cost": st.column_config.NumberColumn("Maintenance Cost", format="$%d"),
+                "replacement_cost": st.column_config.NumberColumn("Replacement Cost", format="$%d"),
+                "last_maintenance": st.column_config.DateColumn("Last Maintenance"),
+            },
+        )
+        st.caption(f"Rows {table_page.first_row:,}–{table_page.last_row:,} of {table_page.total:,} matching assets "
+                   f"(queried in {(time.perf_counter() - started) * 1000:.1f} ms)")
+    else:
+        section(fragment(PREDICTION_CARD, (dict(asset, risk_class=asset["risk_level"].lower()) for asset in high_risk_assets),
+                         key=("priority_assets", shared["version"])))
+
+    # Interactive prediction demo
+    st.markdown("### 🎯 Interactive Asset Analysis")
+
+    # Search the whole fleet by ID prefix; without a query offer the top-20 list
+    asset_query = st.text_input("Search Asset ID:", placeholder="e.g. AST-0042", key="asset_search")
+    if asset_query:
+        search_nums = assets_data["asset_num"].to_numpy()[asset_index.search(asset_query, limit=50)]
+        asset_options = asset_ids(search_nums)
+    else:
+        asset_options = [asset['asset_id'] for asset in high_risk_assets]
+
+    selected_asset_id = st.selectbox("Select Asset for Detailed Analysis:", asset_options)
+
+    if not asset_options:
+        st.info(f"No asset IDs start with '{asset_query}'.")
+    elif st.button("Run ML Prediction Analysis"):
+        selected_position = asset_index.position(selected_asset_id)
+        selected_asset = asset_records(assets_data, [selected_position])[0]
+
+        with st.spinner(f"Running ensemble ML models ({' + '.join(scoring_engine.model_names)})..."):
+            started = time.perf_counter()
+            scores, scored_by = None, "in-process"
+            if shared.get("scoring_client") is not None:
+                try:
+                    response = shared["scoring_client"].score(asset_id=selected_asset_id)
+                    scores = dict(response["scores"], Ensemble=response["failure_probability"])
+                    scored_by = f"inference service, model v{response['model_version']}"
+                except ScoringError as exc:
+                    st.warning(f"Inference service unavailable ({exc}); scored in-process instead.")
+            if scores is None:
+                scores = scoring_engine.score_asset(selected_position)
+            latency_ms = (time.perf_counter() - started) * 1000
+
+        # Generate detailed prediction
+        section(PREDICTION_RESULT.render(
+            asset=selected_asset, ensemble=scores["Ensemble"], latency_ms=latency_ms, scored_by=scored_by,
+            model_rows=MODEL_ROW.render_all({"name": name, "probability": probability}
+                                            for name, probability in scores.items() if name != "Ensemble")))
+
+        # Per-asset drivers from the models' own additive contributions
+        attributions = scoring_engine.explain(selected_position)[0]
+        sensor_values = scoring_engine.features[selected_position]
+        with st.expander("📈 Top Contributing Risk Factors", expanded=True):
+            section(RISK_FACTOR.render_all(
+                {"feature": FEATURE_NAMES[f], "direction": "raises" if attributions[f] > 0 else "lowers",
+                 "points": abs(attributions[f]) * 100, "reading": sensor_values[f], "mean": FEATURE_MEAN[f]}
+                for f in np.argsort(-np.abs(attributions))[:7]))
+            st.caption(f"Contributions sum to {attributions.sum() * 100:+.2f} pts relative to an average asset.")
+
+        # Remaining life from the asset type's fitted Weibull curve, at its current score and age
+        survival = shared["survival"]
+        _, still_running = survival.hazard_curve(selected_position, days=365)
+        with st.expander("⏳ Time-to-Failure Outlook", expanded=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Expected Days to Failure", f"{survival.expected_days([selected_position])[0]:,.0f}")
+            with col2:
+                st.metric("Failure Risk (90 days)", f"{1 - still_running[90]:.1%}")
+            with col3:
+                st.metric("Failure Risk (12 months)", f"{1 - still_running[365]:.1%}")
+            st.line_chart(pd.DataFrame({"Survival probability": still_running}),
+                          x_label="Days from today", y_label="Probability still in service")
+            type_code = survival.type_codes[selected_position]
+            st.caption(f"{selected_asset['asset_type']} Weibull shape {survival.model.shape[type_code]:.2f}, "
+                       f"characteristic life {survival.scale[selected_position]:,.0f} days at this risk score, "
+                       f"{survival.age([selected_position])[0]:,.0f} days since last maintenance.")
+
+    # Fleet-level drivers across the highest-risk assets (cached per asset)
+    with st.expander(f"🧭 Risk Drivers Across the Top {EXPLAIN_TOP_K} Assets"):
+        started = time.perf_counter()
+        top_attributions = scoring_engine.explain(risk_index.top_k(EXPLAIN_TOP_K))
+        explain_ms = (time.perf_counter() - started) * 1000
+        mean_push = top_attributions.mean(axis=0)
+        section('<div class="model-performance">',
+                DRIVER_ROW.render_all({"feature": FEATURE_NAMES[f], "points": mean_push[f] * 100}
+                                      for f in np.argsort(-mean_push)[:10]),
+                f"<p><em>{len(top_attributions)} assets explained in {explain_ms:.1f} ms</em></p></div>")
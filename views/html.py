@@ -0,0 +1,72 @@
+"""Batched HTML sections: one Streamlit element per section instead of one per card.
+
+Every ``st.markdown`` call is its own delta message to the browser, so a
+section of 20 cards rendered in a loop costs 20 messages. Sections here are
+built from templates compiled once at import (dedented and joined onto one
+line, so concatenated cards never form a blank line or an indented block
+that Markdown would turn into a code block) into a single string and sent
+as one element. Rendered fragments are cached by a hash of their template
+and fields, so a rerun with unchanged data skips the formatting.
+"""
+import hashlib
+import textwrap
+import threading
+
+import streamlit as st
+
+from smartgrid.cache import SharedCache
+
+FRAGMENT_CACHE_SIZE = 512
+
+fragments = SharedCache(max_entries=FRAGMENT_CACHE_SIZE)
+_sent = threading.local()       # Streamlit runs each session's script on its own thread
+
+
+class Template:
+    """An HTML snippet with ``str.format`` fields, compacted onto one line once."""
+
+    def __init__(self, source):
+        self.source = " ".join(line.strip() for line in textwrap.dedent(source).strip().splitlines() if line.strip())
+        self.digest = hashlib.blake2b(self.source.encode(), digest_size=8).digest()
+
+    def render(self, **fields):
+        return self.source.format_map(fields)
+
+    def render_all(self, rows):
+        return "".join(map(self.source.format_map, rows))
+
+
+# Headline metric card shared by the pages; a row of them goes inside ``<div class="metric-row">``
+METRIC_CARD = Template("""
+    <div class="ml-metric-card">
+    <h4 style="color: {color};">{label}</h4>
+    <h2>{value}</h2>
+    <small>{note}</small>
+    </div>
+""")
+
+
+def fragment(template, rows, key=None):
+    """``template`` rendered once per mapping in ``rows``, cached by content hash.
+
+    ``key`` (e.g. the fleet version) stands in for hashing ``rows`` when it
+    already identifies them.
+    """
+    content = repr(rows if key is None else key).encode()
+    digest = hashlib.blake2b(template.digest + content, digest_size=16).hexdigest()
+    return fragments.get_or_create(digest, lambda: template.render_all(rows))
+
+
+def section(*parts):
+    """Send the concatenated HTML ``parts`` as one element."""
+    st.markdown("".join(parts), unsafe_allow_html=True)
+    _sent.count = getattr(_sent, "count", 0) + 1
+
+
+def start_page():
+    _sent.count = 0
+
+
+def sections_sent():
+    """Sections sent by this thread since ``start_page``."""
+    return getattr(_sent, "count", 0)
@@ -0,0 +1,190 @@
+"""ML Model Performance: model metrics, feature catalogue and live drift monitoring."""
+import os
+
+import numpy as np
+import streamlit as st
+
+from smartgrid.cache import shared_cache
+from smartgrid.features import ML_FEATURES, N_FEATURES
+from smartgrid.ingest import simulate_readings
+from smartgrid.metrics import STAGE_SECONDS
+from smartgrid.monitoring import DriftMonitor
+from smartgrid.registry import DECISION_THRESHOLD, replay_holdout, shadow_performance
+from smartgrid.scoring import synthesize_training_set
+from smartgrid.validation import REPORT_FILE, cross_validate, load_report, save_report, synthesize_history
+from views.html import Template, fragment, section
+
+DRIFT_BATCHES = 12
+DRIFT_SIMULATION_SEED = 13
+
+# In-process validation when ``python -m smartgrid.validation --root`` has not run for the champion
+QUICK_CV_ROWS = 200_000
+QUICK_CV_FOLDS = 8
+QUICK_CV_WINDOW_WEEKS = 4
+
+# Section templates
+VALIDATION_CARD = Template("""
+    <div class="model-performance">
+    <h4>Rolling-Origin Validation: Champion v{version} recipe, {folds} weekly folds</h4>
+    <div style="display: flex; justify-content: space-between;">
+        <div><strong>Precision:</strong> {spread[precision]}</div>
+        <div><strong>Recall:</strong> {spread[recall]}</div>
+        <div><strong>F1-Score:</strong> {spread[f1_score]}</div>
+        <div><strong>Accuracy:</strong> {spread[accuracy]}</div>
+    </div>
+    <p style="margin-top: 0.5rem;"><strong>Recall at threshold:</strong> {recall_at}</p>
+    </div>
+""")
+
+MODEL_CARD = Template("""
+    <div class="model-performance">
+    <h4>{name}</h4>
+    <div style="display: flex; justify-content: space-between;">
+        <div><strong>Precision:</strong> {precision:.1%}</div>
+        <div><strong>Recall:</strong> {recall:.1%}</div>
+        <div><strong>F1-Score:</strong> {f1_score:.1%}</div>
+        <div><strong>Accuracy:</strong> {accuracy:.1%}</div>
+    </div>
+    </div>
+""")
+
+
+def drift_measurement(shared, batches=DRIFT_BATCHES):
+    """Drift monitor fed simulated telemetry; summaries before and after the last batch."""
+    def build():
+        reference, _ = synthesize_training_set()
+        monitor = DriftMonitor(reference)
+        features = shared["engine"].features
+        rng = np.random.default_rng(DRIFT_SIMULATION_SEED)
+        previous = None
+        for _ in range(batches):
+            previous = monitor.summary() if monitor.batches else None
+            monitor.update_records(simulate_readings(features, len(features) * N_FEATURES, rng,
+                                                     null_rate=0.002, spike_rate=0.001))
+        return {"monitor": monitor, "previous": previous or monitor.summary(), "current": monitor.summary()}
+    return shared_cache.get_or_create("drift_monitor", build, version=shared["version"])
+
+
+def model_performance(shared):
+    """Shadow metrics per serving model version, with a display ``name``; replays the labeled holdout for unlogged versions."""
+    server = shared["models"]
+    versions = server.serving_versions
+
+    def build():
+        registry = server.registry
+        logged = set(np.unique(registry.predictions()["version"]).tolist())
+        if not set(versions) <= logged or not len(registry.outcomes()):
+            replay_holdout(server)
+        performance = {}
+        for version, metrics in shadow_performance(registry, versions=versions).items():
+            meta = registry.metadata(version)
+            performance[version] = dict(metrics, name=f"{metrics['role'].title()} v{version}: {' + '.join(meta['models'])}")
+        return performance
+    return shared_cache.get_or_create("model_performance", build, version=versions)
+
+
+def validation_report(shared):
+    """Rolling-origin CV of the champion's training recipe, from the saved report or a smaller run."""
+    server = shared["models"]
+    champion = server.champion_version
+    path = os.path.join(server.registry.root, REPORT_FILE)
+
+    def build():
+        report = load_report(path)
+        if report is None or report.metadata.get("model_version") != champion:
+            recipe = server.registry.metadata(champion)["metadata"].get("recipe")
+            report = cross_validate(*synthesize_history(QUICK_CV_ROWS), QUICK_CV_FOLDS, QUICK_CV_WINDOW_WEEKS,
+                                    recipe=recipe, workers=1)
+            report.metadata["model_version"] = champion
+            save_report(report, path)
+        return report
+    modified = os.path.getmtime(path) if os.path.exists(path) else None
+    return shared_cache.get_or_create("validation_report", build, version=(champion, modified))
+
+
+def render(shared):
+    st.markdown("### 🧠 Ensemble ML Model Performance")
+
+    # Model performance comparison
+    st.markdown("#### 📊 Model Accuracy Metrics")
+
+    report = validation_report(shared)
+    summary = report.summary()
+    spread = {name: f"{mean:.1%} <span style='color: #888;'>± {std:.1%}</span>" for name, (mean, std) in summary.items()}
+    recall_at = " • ".join(f"p ≥ {float(t):.0%}: {summary[f'recall@{float(t):g}'][0]:.1%}"
+                           for t in report.folds[0].recall_at)
+    performance = model_performance(shared)
+    section(VALIDATION_CARD.render(version=report.metadata["model_version"], folds=len(report.folds), spread=spread,
+                                   recall_at=recall_at),
+            fragment(MODEL_CARD, list(performance.values())))
+    champion = performance.get(shared["models"].champion_version)
+    if champion is None:
+        st.caption("No shadow-logged predictions with observed outcomes for the champion yet.")
+    else:
+        st.caption(f"Latest shadow-logged prediction per asset vs. observed outcome, {champion['assets']:,} assets with "
+                   f"{champion['failures']:,} failures; an asset is flagged at p ≥ {DECISION_THRESHOLD:.0%}. "
+                   f"Challengers score the champion's batches in the background.")
+
+    with st.expander("📅 Per-fold validation results"):
+        st.line_chart({name.replace("_", " ").title(): [getattr(fold, name) for fold in report.folds]
+                       for name in ("precision", "recall", "f1_score")})
+        st.caption(f"Each fold trains on the {report.window_weeks or 'all'} weeks before its origin and tests on the "
+                   f"next {report.horizon_weeks}; {report.n_rows:,} rows of history, first origin "
+                   f"{report.folds[0].origin}, last {report.folds[-1].origin}. "
+                   f"{report.busy_seconds:.1f}s of training on {report.workers} worker(s).")
+
+    # Feature categories
+    st.markdown("#### 🔧 Model Features by Category")
+
+    col1, col2 = st.columns(2)
+
+    for col, categories in ((col1, list(ML_FEATURES)[:3]), (col2, list(ML_FEATURES)[3:])):
+        with col:
+            for category in categories:
+                with st.expander(f"📊 {category}"):
+                    st.markdown("\n".join(f"- {feature}" for feature in ML_FEATURES[category]))
+
+    # Model training pipeline
+    st.markdown("#### 🔄 Automated ML Pipeline (Airflow DAGs)")
+
+    st.markdown("""
+    <div class="model-performance">
+    <h4>Daily Retraining Pipeline</h4>
+    <p><strong>1. Data Ingestion:</strong> Collect 24-hour SCADA/sensor data from 9,247 assets</p>
+    <p><strong>2. Feature Engineering:</strong> Calculate rolling statistics, anomaly scores, trend analysis</p>
+    <p><strong>3. Model Training:</strong> Retrain ensemble models with new data + historical context</p>
+    <p><strong>4. Validation:</strong> Rolling-origin validation, one fold per week of held-out history</p>
+    <p><strong>5. Deployment:</strong> Register challengers, shadow-score them on live batches, atomically promote the winner</p>
+    <p><strong>6. Monitoring:</strong> Track prediction accuracy, drift detection, business impact</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Real-time model monitoring
+    st.markdown("#### 📈 Real-Time Model Monitoring")
+
+    drift = drift_measurement(shared)
+    drift_now, drift_before = drift["current"], drift["previous"]
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Model Drift Score", f"{drift_now.drift_score:.3f}",
+                  f"{drift_now.drift_score - drift_before.drift_score:+.3f}", delta_color="inverse")
+        score_latency = STAGE_SECONDS.labels("score_asset").quantile(0.95) or STAGE_SECONDS.labels("scoring").quantile(0.95)
+        st.metric("Prediction Latency", f"{score_latency * 1000:.2f}ms" if score_latency else "n/a", "p95, live")
+
+    with col2:
+        st.metric("False Positive Rate", f"{champion['false_positive_rate']:.1%}" if champion else "n/a", "champion, shadow log",
+                  delta_color="off")
+        st.metric("Feature Stability", f"{drift_now.feature_stability:.1%}",
+                  f"{(drift_now.feature_stability - drift_before.feature_stability) * 100:+.1f}%")
+
+    with col3:
+        st.metric("Data Quality Score", f"{drift_now.data_quality:.1%}",
+                  f"{(drift_now.data_quality - drift_before.data_quality) * 100:+.1f}%")
+        st.metric("Precision", f"{champion['precision']:.1%}" if champion else "n/a", "champion, shadow log",
+                  delta_color="off")
+
+    drifted = ", ".join(f"{name} (PSI {psi:.3f}, KS {ks:.3f})" for name, psi, ks in drift_now.drifted_features(3))
+    st.caption(f"Drift vs. training data over {drift['monitor'].batches} telemetry batches "
+               f"({drift_now.readings:,.0f} effective readings). Most shifted: {drifted}. "
+               f"Null rate {drift_now.null_rate.mean():.2%}, out-of-range rate {drift_now.out_of_range_rate.mean():.2%}.")
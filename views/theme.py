@@ -0,0 +1,199 @@
+"""Dark-mode stylesheet for the dashboard."""
+
+THEME_CSS = """
+<style>
+    .stApp {
+        background-color: #0e1117;
+        color: #fafafa;
+    }
+    
+    .main-header {
+        font-size: 2.8rem;
+        color: #ff6b35;
+        text-align: center;
+        margin-bottom: 1rem;
+        font-weight: 400;
+        letter-spacing: 1px;
+    }
+    
+    .ai-overlay {
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100%;
+        height: 100%;
+        background: rgba(14, 17, 23, 0.95);
+        backdrop-filter: blur(12px);
+        z-index: 9999;
+        display: flex;
+        justify-content: center;
+        align-items: center;
+    }
+    
+    .ai-assistant {
+        background: linear-gradient(135deg, #2d1b69 0%, #11998e 100%);
+        border: 2px solid #ff6b35;
+        border-radius: 20px;
+        padding: 2.5rem;
+        max-width: 550px;
+        text-align: center;
+        box-shadow: 0 25px 50px rgba(255, 107, 53, 0.3);
+        animation: aiFloat 4s ease-in-out infinite;
+    }
+    
+    @keyframes aiFloat {
+        0%, 100% { transform: translateY(0px) rotate(0deg); }
+        50% { transform: translateY(-15px) rotate(1deg); }
+    }
+    
+    .ai-avatar {
+        width: 90px;
+        height: 90px;
+        border-radius: 50%;
+        background: linear-gradient(135deg, #ff6b35 0%, #f7931e 100%);
+        margin: 0 auto 1.5rem;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 2.5rem;
+        animation: pulse 2.5s infinite;
+        box-shadow: 0 0 30px rgba(255, 107, 53, 0.5);
+    }
+    
+    .prediction-card {
+        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+        border: 1px solid #333;
+        border-radius: 15px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        transition: all 0.3s ease;
+        position: relative;
+        overflow: hidden;
+    }
+    
+    .prediction-card:hover {
+        border-color: #ff6b35;
+        box-shadow: 0 8px 25px rgba(255, 107, 53, 0.2);
+        transform: translateY(-5px);
+    }
+    
+    .prediction-card::before {
+        content: '';
+        position: absolute;
+        top: 0;
+        left: 0;
+        width: 100%;
+        height: 3px;
+        background: linear-gradient(90deg, #ff6b35, #f7931e);
+    }
+    
+    .risk-critical {
+        border-left: 5px solid #ff4757;
+        background: linear-gradient(135deg, #2d1b1b 0%, #1a1a2e 100%);
+    }
+    
+    .risk-high {
+        border-left: 5px solid #ffa502;
+        background: linear-gradient(135deg, #2d2b1b 0%, #1a1a2e 100%);
+    }
+    
+    .risk-medium {
+        border-left: 5px solid #2ed573;
+        background: linear-gradient(135deg, #1b2d1b 0%, #1a1a2e 100%);
+    }
+    
+    .metric-row {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+        margin-bottom: 1rem;
+    }
+    
+    .ml-metric-card {
+        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+        border: 1px solid #444;
+        border-radius: 12px;
+        padding: 1.5rem;
+        text-align: center;
+        transition: all 0.3s ease;
+    }
+    
+    .ml-metric-card:hover {
+        border-color: #ff6b35;
+        transform: scale(1.05);
+    }
+    
+    .model-performance {
+        background: #2d1b69;
+        border-radius: 10px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        border-left: 4px solid #11998e;
+    }
+    
+    .crew-optimization {
+        background: #1b2d2d;
+        border-radius: 10px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        border-left: 4px solid #00d4aa;
+    }
+    
+    .cost-savings {
+        background: #2d2d1b;
+        border-radius: 10px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        border-left: 4px solid #f7931e;
+    }
+    
+    .architecture-node {
+        background: #1a1a2e;
+        border: 2px solid #ff6b35;
+        border-radius: 15px;
+        padding: 1rem;
+        margin: 0.5rem;
+        text-align: center;
+        transition: all 0.3s ease;
+    }
+    
+    .architecture-node:hover {
+        background: #2d1b69;
+        transform: scale(1.1);
+    }
+    
+    .stButton > button {
+        background: linear-gradient(135deg, #ff6b35 0%, #f7931e 100%);
+        color: white;
+        border: none;
+        border-radius: 25px;
+        padding: 0.7rem 2rem;
+        font-weight: 600;
+        transition: all 0.3s ease;
+        text-transform: uppercase;
+        letter-spacing: 1px;
+    }
+    
+    .stButton > button:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 25px rgba(255, 107, 53, 0.4);
+    }
+    
+    .feature-importance {
+        background: #16213e;
+        border-radius: 8px;
+        padding: 1rem;
+        margin: 0.5rem 0;
+        border-left: 3px solid #ff6b35;
+    }
+    
+    .footer {
+        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+        border-top: 2px solid #ff6b35;
+        padding: 2rem;
+        text-align: center;
+        margin-top: 3rem;
+        border-radius: 15px;
+    }
+</style>
+"""